@@ -0,0 +1 @@
+"""Benchmarks of index_calculator."""
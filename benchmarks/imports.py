@@ -0,0 +1,26 @@
+"""Benchmarks of the import time in a fresh interpreter."""
+
+
+class Import:
+    """Import index_calculator and its public classes."""
+
+    def timeraw_import(self):
+        return "import index_calculator"
+
+    def timeraw_import_classes(self):
+        return """
+        import index_calculator
+        index_calculator.index_calculator
+        """
+
+    def timeraw_import_indices(self):
+        return """
+        import index_calculator._indices as indices
+        indices.TG()
+        """
+
+    def timeraw_resolve_indicator(self):
+        return """
+        import index_calculator._indices as indices
+        indices.TG().func
+        """
@@ -0,0 +1,50 @@
+"""Benchmarks of the climate index classes."""
+
+import dask
+
+import index_calculator as xcalc
+from index_calculator._cache import memo_scope
+
+from .synthetic import synthetic_dataset
+
+_variables = ("tas", "tasmax", "tasmin", "pr", "uas", "vas")
+
+
+def _indices():
+    """Get climate indices computable from synthetic variables."""
+    indices = []
+    for index, input_variables in xcalc.vjson.items():
+        if isinstance(input_variables, str):
+            input_variables = [input_variables]
+        if all(v in _variables + ("sfcWind",) for v in input_variables):
+            indices.append(index)
+    return indices
+
+
+class Index:
+    """Compute each climate index class from a pre-processed dataset."""
+
+    params = (_indices(), ["small", "medium"])
+    param_names = ["index", "size"]
+    timeout = 600
+
+    def setup(self, index, size):
+        ds = synthetic_dataset(_variables, size=size, chunks={"time": 365})
+        self.preproc = xcalc.preprocessing(ds, freq="year", project="CORDEX")
+        try:
+            with memo_scope():
+                xcalc.processing(index=index, preproc_obj=self.preproc)
+        except NameError as e:
+            # input variables of index are not defined
+            raise NotImplementedError(f"{index} not computable: {e}")
+
+    def _compute(self, index):
+        with memo_scope():
+            proc = xcalc.processing(index=index, preproc_obj=self.preproc)
+            dask.compute(proc.proc)
+
+    def time_compute(self, index, size):
+        self._compute(index)
+
+    def peakmem_compute(self, index, size):
+        self._compute(index)
@@ -0,0 +1,69 @@
+"""Benchmarks of day-of-year percentile calculation."""
+
+from xclim.core.calendar import percentile_doy
+
+from index_calculator._cache import percentile_memo
+from index_calculator._climate_indicator import ClimateIndicator
+from index_calculator._indices import TX90p
+from index_calculator._kernels import percentile_doy as partition_percentile_doy
+
+from .synthetic import synthetic_dataset
+
+
+class PercentileDoy:
+    """Day-of-year percentiles of a 30-year base period."""
+
+    params = (["small", "medium"],)
+    param_names = ["size"]
+    timeout = 1200
+
+    def setup(self, size):
+        ds = synthetic_dataset(("tas",), size=size, chunks={"time": -1, "rlat": 20})
+        self.da = ds.tas
+        percentile_memo.clear()
+
+    def time_xclim(self, size):
+        percentile_doy(self.da, window=5, per=[10, 90]).compute()
+
+    def peakmem_xclim(self, size):
+        percentile_doy(self.da, window=5, per=[10, 90]).compute()
+
+    def time_partition(self, size):
+        partition_percentile_doy(self.da, window=5, per=[10, 90]).compute()
+
+    def peakmem_partition(self, size):
+        partition_percentile_doy(self.da, window=5, per=[10, 90]).compute()
+
+    def time_climate_indicator(self, size):
+        percentile_memo.clear()
+        ClimateIndicator()._get_percentile(
+            self.da, [10, 90], base_period_time_range=["1971", "2000"]
+        )
+
+    def peakmem_climate_indicator(self, size):
+        percentile_memo.clear()
+        ClimateIndicator()._get_percentile(
+            self.da, [10, 90], base_period_time_range=["1971", "2000"]
+        )
+
+
+class Bootstrap:
+    """TX90p of 12 years with a bootstrapped 10-year base period."""
+
+    params = (["xclim", "partition"],)
+    param_names = ["engine"]
+    timeout = 1200
+
+    def setup(self, engine):
+        ds = synthetic_dataset(("tasmax",), size=(30, 30, 12))
+        self.da = ds.tasmax
+        percentile_memo.clear()
+
+    def time_tx90p(self, engine):
+        TX90p().compute(
+            tasmax=self.da,
+            freq="YS",
+            base_period_time_range=["1971", "1980"],
+            bootstrap=True,
+            percentile_engine=engine,
+        ).compute()
@@ -0,0 +1,87 @@
+"""Benchmarks of the full pipeline and the output writer."""
+
+import shutil
+import tempfile
+
+import dask
+
+import index_calculator as xcalc
+
+from .synthetic import synthetic_dataset
+
+_kwargs = {
+    "freq": "year",
+    "project": "CORDEX",
+    "institution": "benchmark institution",
+    "institution_id": "BENCH",
+    "contact": "bench@bench.de",
+}
+
+
+class IndexCalculator:
+    """Run the whole chain from pre-processing to writing."""
+
+    params = (["TG", "TX90p", "CDD", "R10mm"], ["small", "medium"])
+    param_names = ["index", "size"]
+    timeout = 1200
+
+    def setup(self, index, size):
+        self.ds = synthetic_dataset(
+            ("tas", "tasmax", "pr"), size=size, chunks={"time": 365}
+        )
+        self.output_dir = tempfile.mkdtemp()
+
+    def teardown(self, index, size):
+        shutil.rmtree(self.output_dir)
+
+    def _run(self, index):
+        xcalc.index_calculator(
+            ds=self.ds,
+            index=index,
+            write=True,
+            output_dir=self.output_dir,
+            **_kwargs,
+        )
+
+    def time_index_calculator(self, index, size):
+        self._run(index)
+
+    def peakmem_index_calculator(self, index, size):
+        self._run(index)
+
+
+class OutputWriter:
+    """Write computed climate index datasets."""
+
+    params = (["netcdf", "zarr"], [None, "archive"], ["small", "medium"])
+    param_names = ["output_format", "encoding_profile", "size"]
+    timeout = 600
+
+    def setup(self, output_format, encoding_profile, size):
+        if output_format == "zarr":
+            try:
+                import zarr  # noqa
+            except ImportError:
+                raise NotImplementedError("zarr not installed")
+        ds = synthetic_dataset(("tas",), size=size, chunks={"time": 365})
+        idx = xcalc.index_calculator(ds=ds, index="TG", **{**_kwargs, "freq": "mon"})
+        (idx.postproc,) = dask.compute(idx.postproc)
+        self.postproc_obj = idx
+        self.output_dir = tempfile.mkdtemp()
+
+    def teardown(self, output_format, encoding_profile, size):
+        shutil.rmtree(self.output_dir)
+
+    def _write(self, output_format, encoding_profile):
+        xcalc.outputwriter(
+            postproc_obj=self.postproc_obj,
+            output_dir=self.output_dir,
+            output_format=output_format,
+            encoding_profile=encoding_profile,
+        )
+
+    def time_outputwriter(self, output_format, encoding_profile, size):
+        self._write(output_format, encoding_profile)
+
+    def peakmem_outputwriter(self, output_format, encoding_profile, size):
+        self._write(output_format, encoding_profile)
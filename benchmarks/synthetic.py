@@ -0,0 +1,115 @@
+"""Synthetic CORDEX-like datasets for benchmarking."""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+# (number of rlat, number of rlon, number of years)
+sizes = {
+    "small": (20, 20, 5),
+    "medium": (100, 100, 30),
+    "large": (412, 424, 30),
+}
+
+_attrs = {
+    "tas": ("air_temperature", "K", "time: mean"),
+    "tasmax": ("air_temperature", "K", "time: maximum"),
+    "tasmin": ("air_temperature", "K", "time: minimum"),
+    "pr": ("precipitation_flux", "kg m-2 s-1", "time: mean"),
+    "uas": ("eastward_wind", "m s-1", "time: mean"),
+    "vas": ("northward_wind", "m s-1", "time: mean"),
+}
+
+_global_attrs = {
+    "project_id": "CORDEX",
+    "CORDEX_domain": "EUR-11",
+    "driving_model_id": "MPI-M-MPI-ESM-LR",
+    "driving_experiment_name": "historical",
+    "driving_model_ensemble_member": "r1i1p1",
+    "model_id": "GERICS-REMO2015",
+    "rcm_version_id": "v1",
+    "frequency": "day",
+    "institute_id": "GERICS",
+}
+
+
+def _values(variable, doy, shape, rng):
+    if variable == "pr":
+        values = rng.gamma(0.6, 4.0, shape) - 1.5
+        return np.clip(values, 0, None) / 86400
+    if variable in ["uas", "vas"]:
+        return rng.normal(0, 4, shape)
+    offset = {"tas": 0, "tasmax": 5, "tasmin": -5}[variable]
+    seasonal = 12 * np.sin(2 * np.pi * (doy - 100) / 365)
+    return 283.15 + offset + seasonal + rng.normal(0, 4, shape)
+
+
+def synthetic_dataset(
+    variables=("tas",),
+    size="small",
+    start="1971-01-01",
+    chunks=None,
+    seed=0,
+):
+    """Create synthetic daily dataset on a rotated-pole grid.
+
+    Parameters
+    ----------
+    variables: tuple
+        Variable names of "tas", "tasmax", "tasmin", "pr", "uas" and "vas".
+    size: str or tuple
+        One of `sizes` or a tuple of (rlat, rlon, years).
+    start: str
+        First day of the time series.
+    chunks: dict, optional
+        Dask chunks of the dataset. If None the dataset is not chunked.
+    seed: int
+        Seed of the random number generator.
+
+    Returns
+    -------
+    xr.Dataset
+    """
+    ny, nx, years = sizes.get(size, size)
+    rng = np.random.default_rng(seed)
+    time = pd.date_range(start, periods=years * 365 + years // 4, freq="D")
+    rlat = np.linspace(-23.375, 21.835, ny)
+    rlon = np.linspace(-28.375, 18.155, nx)
+    lon, lat = np.meshgrid(rlon + 10.0, rlat + 50.0)
+    doy = time.dayofyear.values[:, None, None]
+    shape = (time.size, ny, nx)
+    data_vars = {}
+    for variable in variables:
+        standard_name, units, cell_methods = _attrs[variable]
+        data_vars[variable] = (
+            ("time", "rlat", "rlon"),
+            _values(variable, doy, shape, rng).astype("float32"),
+            {
+                "standard_name": standard_name,
+                "units": units,
+                "cell_methods": cell_methods,
+                "grid_mapping": "rotated_pole",
+            },
+        )
+    ds = xr.Dataset(
+        data_vars,
+        coords={
+            "time": time,
+            "rlat": ("rlat", rlat, {"standard_name": "grid_latitude"}),
+            "rlon": ("rlon", rlon, {"standard_name": "grid_longitude"}),
+            "lat": (("rlat", "rlon"), lat, {"standard_name": "latitude"}),
+            "lon": (("rlat", "rlon"), lon, {"standard_name": "longitude"}),
+        },
+        attrs=dict(_global_attrs),
+    )
+    ds["rotated_pole"] = xr.DataArray(
+        np.array(b"", dtype="S1"),
+        attrs={
+            "grid_mapping_name": "rotated_latitude_longitude",
+            "grid_north_pole_latitude": 39.25,
+            "grid_north_pole_longitude": -162.0,
+        },
+    )
+    if chunks is not None:
+        ds = ds.chunk(chunks)
+    return ds
@@ -3,20 +3,28 @@
 __author__ = """Ludwig Lierhammer"""
 __email__ = "ludwig.lierhammer@dwd.de"
 
+import importlib
+
+from ._batch import BatchCalculator as batch
 from ._outputwriter import OutputWriter as outputwriter
 from ._postprocessing import PostProcessing as postprocessing
 from ._preprocessing import PreProcessing as preprocessing
 from ._processing import Processing as processing
-from ._tables import (
-    cfjson,  # noqa
-    fjson,  # noqa
-    mjson,  # noqa
-    pjson,  # noqa
-    vjson,  # noqa
-    xjson,  # noqa
-)
 from .index_calculator import IndexCalculator as index_calculator
 
+# JSON tables are read on first access (PEP 562). xclim is imported
+# only when an indicator is computed.
+_table_names = ["cfjson", "fjson", "mjson", "pjson", "vjson", "xjson"]
+
+__all__ = [
+    "preprocessing",
+    "processing",
+    "postprocessing",
+    "outputwriter",
+    "index_calculator",
+    "batch",
+] + _table_names
+
 
 def _get_version():
     __version__ = "unknown"
@@ -39,3 +47,17 @@ outputwriter.__module__ = __name__
 outputwriter.__name__ = "outputwriter"
 index_calculator.__module__ = __name__
 index_calculator.__name__ = "index_calculator"
+batch.__module__ = __name__
+batch.__name__ = "batch"
+
+
+def __getattr__(name):
+    if name not in _table_names:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module("._tables", __name__), name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
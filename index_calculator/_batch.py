@@ -0,0 +1,155 @@
+import dask
+
+from ._cache import memo_scope
+from ._outputwriter import OutputWriter as outputwriter
+from ._postprocessing import PostProcessing as postprocessing
+from ._preprocessing import PreProcessing as preprocessing
+from ._processing import Processing as processing
+from ._registry import registry
+from ._utils import kwargs_to_self
+
+
+class BatchCalculator:
+    """Class for calculating many climate indices from one dataset.
+
+    The input dataset is pre-processed only once per set of input
+    variables. The climate index graphs are built lazily and evaluated
+    together with one single ``dask.compute`` call so that shared reads
+    and shared intermediate results are computed only once.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        xarray Dataset.
+    indices: list
+        Climate indicator names to be calculated.
+    write: bool (default: False), optional
+        If True write climate index datasets on disk.
+        The written file names of each climate index
+        are stored in `outputs`.
+
+    Notes
+    -----
+    For more parameter information see:
+
+        :func:`~index_calculator.preprocessing`
+        :func:`~index_calculator.processing`
+        :func:`~index_calculator.postprocessing`
+        :func:`~index_calculator.outputwriter`
+
+    Example
+    -------
+    Calculate several climate indicators and write datasets as netcdf files
+    on disk::
+
+        from pyhomogenize import open_xrdataset
+        from index_calculator import batch
+
+        netcdf_files = [
+            "tas_EUR-11_MPI-M-MPI-ESM-LR_historical_r3i1p1_"
+            "GERICS-REMO2015_v1_day_20010101-20051231.nc",
+            "pr_EUR-11_MPI-M-MPI-ESM-LR_historical_r3i1p1_"
+            "GERICS-REMO2015_v1_day_20010101-20051231.nc",
+        ]
+        ds = open_xrdataset(netcdf_files)
+
+        idx = batch(
+                write=True,
+                ds=ds,
+                indices=["TG", "RR", "RX5day"],
+                project="CORDEX",
+                institution_id="GERICS",
+                institution="Helmholtz-Zentrum hereon GmbH,"
+                            "Climate Service Center Germany",
+                contact="gerics-cordex@hereon.de",
+        )
+
+        tg_ds = idx.results["TG"].postproc
+    """
+
+    def __init__(self, ds=None, indices=None, write=False, **kwargs):
+        if ds is None:
+            raise ValueError("Please select an input xarray dataset. 'ds=...'")
+        if not indices:
+            raise ValueError(
+                "Please select a list of climate indicator names. 'indices=[...]'"
+            )
+        if isinstance(indices, str):
+            indices = [indices]
+        self.ds = ds
+        self.indices = list(indices)
+        kwargs_to_self(kwargs, self)
+        with memo_scope():
+            self.results = self._compute(write=write, **kwargs)
+
+    def _get_input_variables(self, index):
+        """Get input variables of climate index from input_vars.json."""
+        input_variables = registry.resolve(index)[0].input_variables
+        if input_variables is None:
+            raise NameError(f"{index} not defined.")
+        return input_variables
+
+    def _select_variables(self, input_variables):
+        """Select input variables and time-independent variables from `ds`.
+
+        If not all `input_variables` are contained in `ds` they may be
+        converted from other variables during processing. In that case all
+        variables are kept.
+        """
+        time_vars = [v for v in self.ds.data_vars if "time" in self.ds[v].dims]
+        if not all(v in time_vars for v in input_variables):
+            return tuple(time_vars)
+        return tuple(v for v in time_vars if v in input_variables)
+
+    def _group_indices(self):
+        """Group climate indices by input variables."""
+        groups = {}
+        for index in self.indices:
+            input_variables = self._get_input_variables(index)
+            key = self._select_variables(input_variables)
+            groups.setdefault(key, []).append(index)
+        return groups
+
+    def _preprocessing(self, variables, **kwargs):
+        """Pre-process `ds` restricted to `variables`."""
+        fx_vars = [v for v in self.ds.data_vars if "time" not in self.ds[v].dims]
+        ds = self.ds[list(variables) + fx_vars]
+        ds.attrs = self.ds.attrs
+        return preprocessing(ds=ds, **kwargs)
+
+    def _evaluate(self, postproc_objs):
+        """Evaluate all climate index graphs with one single compute call."""
+        datasets = []
+        for postproc_obj in postproc_objs.values():
+            if isinstance(postproc_obj.postproc, list):
+                datasets += postproc_obj.postproc
+            else:
+                datasets += [postproc_obj.postproc]
+        computed = list(dask.compute(*datasets))
+        for postproc_obj in postproc_objs.values():
+            if isinstance(postproc_obj.postproc, list):
+                n = len(postproc_obj.postproc)
+                postproc_obj.postproc = computed[:n]
+                computed = computed[n:]
+            else:
+                postproc_obj.postproc = computed.pop(0)
+        return postproc_objs
+
+    def _compute(self, write=False, **kwargs):
+        """Compute climate indices."""
+        postproc_objs = {}
+        for variables, indices in self._group_indices().items():
+            preproc_obj = self._preprocessing(variables, **kwargs)
+            for index in indices:
+                proc_obj = processing(index=index, preproc_obj=preproc_obj)
+                postproc_objs[index] = postprocessing(proc_obj=proc_obj)
+        postproc_objs = self._evaluate(postproc_objs)
+        self.outputs = {}
+        if write is True:
+            for index, postproc_obj in postproc_objs.items():
+                writer = outputwriter(
+                    postproc_obj=postproc_obj,
+                    **kwargs,
+                )
+                self.outputs[index] = writer.output_files
+        return postproc_objs
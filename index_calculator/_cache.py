@@ -0,0 +1,308 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+from dask.base import tokenize
+from dask.utils import parse_bytes
+
+from ._consts import _memo_entries, _memo_size, _percentile_cache_size
+
+
+def _coords_fingerprint(da):
+    """Get coordinate values of `da` sorted by name.
+
+    Object coordinates (e.g. cftime dates) are converted to strings since
+    their pickled state is not stable.
+    """
+    coords = {}
+    for k, v in da.coords.items():
+        values = v.values
+        if values.dtype == object:
+            values = values.astype(str)
+        coords[k] = values
+    return sorted(coords.items())
+
+
+def _mix(x):
+    """Scramble unsigned 64-bit integers (splitmix64 finalizer)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _block_checksum(block, shape, location):
+    """Sum of the hashes of all values of `block` and their positions.
+
+    `location` holds the start index of `block` along every dimension of
+    the whole array of shape `shape`. Sums wrap around modulo 2**64.
+    """
+    block = np.ascontiguousarray(block)
+    bits = block.view(f"u{block.dtype.itemsize}").astype(np.uint64)
+    index = np.ravel_multi_index(
+        [i + start for i, start in zip(np.indices(block.shape), location)],
+        shape,
+    ).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        checksum = _mix(_mix(index) ^ bits).sum(dtype=np.uint64)
+    return np.full((1,) * block.ndim, checksum, dtype=np.uint64)
+
+
+def checksum(variable):
+    """Get checksum of the values of `variable`.
+
+    The checksum does not depend on whether and how `variable` is chunked.
+    Dask-backed values are streamed chunk by chunk and are never loaded
+    into memory at once.
+    """
+    data = variable.data
+    if variable.chunks is None:
+        return int(_block_checksum(data, data.shape, (0,) * data.ndim).sum())
+
+    def block_checksum(block, block_info=None):
+        location = [start for start, _ in block_info[0]["array-location"]]
+        return _block_checksum(block, data.shape, location)
+
+    checksums = data.map_blocks(
+        block_checksum,
+        dtype=np.uint64,
+        chunks=tuple((1,) * len(c) for c in data.chunks),
+    )
+    return int(checksums.sum(dtype=np.uint64).compute())
+
+
+def get_key(da, **kwargs):
+    """Create cache key from `da` fingerprint and parameters.
+
+    The fingerprint consists of the variable's data, dimensions and
+    attributes and of the coordinate values. Encodings are ignored.
+    Dask-backed data is identified by its graph name, which is cheap but
+    depends on e.g. the input files and the chunking. Use
+    :func:`get_content_key` for keys that have to be stable across runs.
+    """
+    return tokenize(da.variable, _coords_fingerprint(da), sorted(kwargs.items()))
+
+
+def get_content_key(da, **kwargs):
+    """Create cache key from the values of `da` and parameters.
+
+    Unlike :func:`get_key` the fingerprint of dask-backed data is a
+    :func:`checksum` of its values. Hence, the key neither depends on the
+    input files nor on the chunking, but computing it reads `da` once.
+    """
+    variable = da.variable
+    return tokenize(
+        variable.dims,
+        variable.dtype.str,
+        variable.shape,
+        checksum(variable),
+        variable.attrs,
+        _coords_fingerprint(da),
+        sorted(kwargs.items()),
+    )
+
+
+def covers(da, per):
+    """Check whether `da` contains all percentiles `per`."""
+    if da is None:
+        return False
+    return all(p in da.percentiles.values for p in per)
+
+
+def _nbytes(obj):
+    """Get number of bytes `obj` holds in memory.
+
+    Dask-backed variables are not loaded and are not taken into account.
+    """
+    if isinstance(obj, xr.DataArray):
+        variables = [obj.variable] + [c.variable for c in obj.coords.values()]
+    elif isinstance(obj, xr.Dataset):
+        variables = obj.variables.values()
+    else:
+        return 0
+    return sum(v.nbytes for v in variables if v.chunks is None)
+
+
+class Memo:
+    """In-process LRU memo for intermediate results.
+
+    The memo is thread-safe. The least recently used objects are deleted
+    if either the number of memoized objects exceeds `maxsize` or their
+    total size in memory exceeds `max_bytes`.
+
+    Parameters
+    ----------
+    maxsize: int (default: 8), optional
+        Maximum number of memoized objects.
+        If 0, nothing is memoized.
+    max_bytes: int or str (default: "1GB"), optional
+        Maximum total size of the memoized objects either in bytes or
+        as a string like "500MB". Larger objects are not memoized.
+    """
+
+    def __init__(self, maxsize=_memo_entries, max_bytes=_memo_size):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._memo = OrderedDict()
+        self._nbytes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        if isinstance(max_bytes, str):
+            max_bytes = parse_bytes(max_bytes)
+        self._max_bytes = max_bytes
+
+    @property
+    def nbytes(self):
+        """Total size of the memoized objects in memory."""
+        return sum(self._nbytes.values())
+
+    def get(self, key):
+        """Get object from memo.
+
+        Returns None if `key` is not memoized.
+        """
+        with self._lock:
+            if key not in self._memo:
+                return None
+            self._memo.move_to_end(key)
+            return self._memo[key]
+
+    def put(self, key, obj):
+        """Memoize object."""
+        nbytes = _nbytes(obj)
+        with self._lock:
+            self._memo.pop(key, None)
+            self._nbytes.pop(key, None)
+            if self.maxsize < 1 or nbytes > self.max_bytes:
+                return
+            self._memo[key] = obj
+            self._nbytes[key] = nbytes
+            self._evict()
+
+    def resize(self, max_bytes):
+        """Set `max_bytes` and delete objects exceeding it."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while len(self._memo) > self.maxsize or self.nbytes > self.max_bytes:
+            key, _ = self._memo.popitem(last=False)
+            del self._nbytes[key]
+
+    def clear(self):
+        """Clear memo."""
+        with self._lock:
+            self._memo.clear()
+            self._nbytes.clear()
+
+
+percentile_memo = Memo()
+count_memo = Memo()
+spell_memo = Memo()
+_memos = [percentile_memo, count_memo, spell_memo]
+
+_scope_lock = threading.Lock()
+_scope_depth = 0
+
+
+def resize_memos(max_bytes):
+    """Set maximum size of all in-process memos."""
+    for memo in _memos:
+        memo.resize(max_bytes)
+
+
+@contextmanager
+def memo_scope():
+    """Scope in-process memos to one run.
+
+    All memos are cleared as soon as the last of all active (possibly
+    nested or concurrent) scopes ends, so that memoized intermediate
+    results do not outlive the run computing them.
+    """
+    global _scope_depth
+    with _scope_lock:
+        _scope_depth += 1
+    try:
+        yield
+    finally:
+        with _scope_lock:
+            _scope_depth -= 1
+            if _scope_depth == 0:
+                for memo in _memos:
+                    memo.clear()
+
+
+class PercentileCache:
+    """Content-addressed on-disk cache for percentile reference values.
+
+    Percentiles are stored as netCDF files named after a hash of the
+    base period values (see :func:`get_content_key`) and all parameters
+    the percentiles depend on. Thus, the same base period is found again
+    regardless of the input files it is read from and of its chunking. If the total size of the cache directory exceeds
+    `max_size` the least recently used files are deleted.
+
+    Parameters
+    ----------
+    directory: str
+        Cache directory.
+    max_size: int or str (default: "10GB"), optional
+        Maximum size of the cache directory either in bytes or
+        as a string like "500MB".
+    """
+
+    def __init__(self, directory, max_size=_percentile_cache_size):
+        self.directory = Path(directory)
+        if isinstance(max_size, str):
+            max_size = parse_bytes(max_size)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / f"{key}.nc"
+
+    def get(self, key):
+        """Read percentiles from cache.
+
+        Returns None if `key` is not cached.
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+        os.utime(path)
+        with xr.open_dataarray(path) as da:
+            return da.load()
+
+    def put(self, key, da):
+        """Write percentiles to cache."""
+        fd, tmp = tempfile.mkstemp(suffix=".nc.tmp", dir=self.directory)
+        os.close(fd)
+        try:
+            da.to_netcdf(tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until cache fits `max_size`."""
+        files = sorted(
+            self.directory.glob("*.nc"),
+            key=lambda f: f.stat().st_mtime,
+        )
+        size = sum(f.stat().st_size for f in files)
+        while size > self.max_size and len(files) > 1:
+            oldest = files.pop(0)
+            size -= oldest.stat().st_size
+            oldest.unlink()
@@ -0,0 +1,85 @@
+from inspect import signature
+
+from dask.utils import parse_bytes
+
+from ._consts import _chunk_budget, _chunk_spatial
+from ._tiling import get_horizontal_dims
+
+
+def get_index_family(idx_obj):
+    """Get index family of ``index_calculator._indices`` object.
+
+    Returns
+    -------
+    str
+        One of "percentile", "spell", "rolling", "count" or "aggregate".
+    """
+    if "base_period_time_range" in signature(idx_obj.compute).parameters:
+        return "percentile"
+    if idx_obj._spell is not None:
+        return "spell"
+    if hasattr(idx_obj, "window"):
+        return "rolling"
+    if idx_obj._count is not None:
+        return "count"
+    return "aggregate"
+
+
+def _split_points(points, sizes):
+    """Distribute `points` grid points over dimensions of `sizes`."""
+    chunks = {}
+    for i, (dim, size) in enumerate(sizes.items()):
+        side = int(points ** (1 / (len(sizes) - i)))
+        chunks[dim] = min(size, max(1, side))
+        points = points // chunks[dim]
+    return chunks
+
+
+def plan_chunks(ds, family, budget=_chunk_budget):
+    """Plan chunks of `ds` for calculating an index of `family`.
+
+    Percentile, spell and rolling-window indices need the whole time axis
+    within one chunk. The horizontal chunks are as large as the memory
+    budget allows. Count and aggregate indices get small horizontal
+    chunks and as many whole years as fit into the memory budget.
+
+    Parameters
+    ----------
+    ds: xr.Dataset
+        Pre-processed dataset.
+    family: str
+        Index family (see :func:`get_index_family`).
+    budget: int or str (default: "128MB"), optional
+        Maximum size of one chunk either in bytes or
+        as a string like "500MB".
+
+    Returns
+    -------
+    dict
+        Chunk sizes of time and horizontal dimensions.
+    """
+    if isinstance(budget, str):
+        budget = parse_bytes(budget)
+    time_vars = [v for v in ds.data_vars if "time" in ds[v].dims]
+    itemsize = max(ds[v].dtype.itemsize for v in time_vars)
+    points = max(1, budget // itemsize)
+    ntime = ds.sizes["time"]
+    sizes = {dim: ds.sizes[dim] for dim in get_horizontal_dims(ds)}
+    total = ntime
+    for size in sizes.values():
+        total *= size
+    if total <= points:
+        return {**sizes, "time": ntime}
+    if family in ["percentile", "spell", "rolling"]:
+        chunks = _split_points(max(1, points // ntime), sizes)
+        chunks["time"] = ntime
+        return chunks
+    chunks = {dim: min(size, _chunk_spatial) for dim, size in sizes.items()}
+    spatial = 1
+    for chunk in chunks.values():
+        spatial *= chunk
+    time_chunk = min(ntime, max(1, points // spatial))
+    if ntime > time_chunk >= 365:
+        time_chunk -= time_chunk % 365
+    chunks["time"] = time_chunk
+    return chunks
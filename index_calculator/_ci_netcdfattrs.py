@@ -1,7 +1,6 @@
 import warnings
 from datetime import datetime as dt
-
-import xclim as xc
+from importlib.metadata import version
 
 
 def _get_version():
@@ -142,7 +141,7 @@ class NetCDFglobalattrs(NetCDFattrs):
 
     def _ci_package_name(self, obj):
         """Add xclim version to dictionary."""
-        return f"xclim_{xc.__version__}"
+        return f"xclim_{version('xclim')}"
 
     def _ci_reference_period(self, obj):
         """Add reference period to dictionary."""
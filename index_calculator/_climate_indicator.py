@@ -1,22 +1,58 @@
+import importlib
+import importlib.util
 from copy import deepcopy
+from functools import reduce
 from inspect import signature
 from warnings import warn
 
 import dask
+import numpy as np
 import xarray as xr
-from xclim.core.calendar import percentile_doy
-from xclim.core.units import convert_units_to
 
+from ._cache import (
+    PercentileCache,
+    count_memo,
+    covers,
+    get_content_key,
+    get_key,
+    percentile_memo,
+    resize_memos,
+    spell_memo,
+)
 from ._consts import _base_period as BASE_PERIOD
+from ._consts import _doy_window as DOY_WINDOW
+from ._consts import _options as OPTIONS
+from ._consts import _percentiles as PERCENTILES
 
 
 class ClimateIndicator:
     def __init__(self):
-        self.func = None
+        self._func = None
         self.units = {}
         self.date_bounds = None
         self.base_period_time_range = BASE_PERIOD
         self.split_large_chunks = True
+        self._options = dict(OPTIONS)
+        self._count = None
+        self._compound = None
+        self._spell = None
+
+    @property
+    def func(self):
+        """Get xclim indicator.
+
+        Indicators are set as dotted paths relative to the ``xclim``
+        package (e.g. "atmos.tg_mean") and resolved on first access, so
+        that xclim is only imported when an index is computed.
+        """
+        if isinstance(self._func, str):
+            xclim = importlib.import_module("xclim")
+            self._func = reduce(getattr, self._func.split("."), xclim)
+        return self._func
+
+    @func.setter
+    def func(self, func):
+        self._func = func
 
     def _thresh_string(self, thresh, units):
         if isinstance(thresh, str):
@@ -77,24 +113,111 @@ class ClimateIndicator:
         return kwargs
 
     def _filter_out_small_values(self, da, thresh="1mm/day", context="hydro"):
+        from xclim.core.units import convert_units_to
+
         thresh = convert_units_to(thresh, da, context=context)
         return da.where(da > thresh)
 
-    def _get_percentile(self, da, per, base_period_time_range):
+    def _get_options(self, params):
+        options = {}
+        for option, default in OPTIONS.items():
+            options[option] = params.pop(option, default)
+        return self._check_numba(options)
+
+    def _check_numba(self, options):
+        """Fall back to xclim if the compiled kernels are not available."""
+        if importlib.util.find_spec("numba") is not None:
+            return options
+        for option, value in [
+            ("spell_backend", "numba"),
+            ("percentile_engine", "partition"),
+        ]:
+            if options[option] != value:
+                continue
+            warn(
+                f"{option} '{value}' needs numba, which is not installed. "
+                "Falling back to 'xclim'. To install numba, run "
+                "'pip install index_calculator[numba]'."
+            )
+            options[option] = "xclim"
+        return options
+
+    def _get_percentile_cache(self):
+        if self._options["percentile_cache"] is None:
+            return
+        return PercentileCache(
+            self._options["percentile_cache"],
+            max_size=self._options["percentile_cache_size"],
+        )
+
+    def _percentile_doy(self, da, per):
+        """Calculate day-of-year percentiles with the selected engine."""
+        engine = self._options["percentile_engine"]
+        doy_block = self._options["percentile_doy_block"]
+        if engine == "partition":
+            from ._kernels import percentile_doy
+
+            return percentile_doy(
+                da, window=DOY_WINDOW, per=per, doy_block=doy_block
+            ).compute()
+        if engine != "xclim":
+            raise ValueError(
+                f"Percentile engine {engine} not supported. "
+                "Please select one of 'xclim' or 'partition'."
+            )
+        if doy_block is not None:
+            raise ValueError(
+                "percentile_doy_block is only supported by "
+                "percentile engine 'partition'."
+            )
+        from xclim.core.calendar import percentile_doy
+
+        with dask.config.set(**{"array.slicing.split_large_chunks": False}):
+            return percentile_doy(da, window=DOY_WINDOW, per=per).compute()
+
+    def _get_percentile_doy(self, da, per, method, base_period_time_range):
+        params = {
+            "window": DOY_WINDOW,
+            "method": method,
+            "base_period_time_range": base_period_time_range,
+        }
+        key = get_key(da, **params)
+        per_doy = percentile_memo.get(key)
+        if covers(per_doy, per):
+            return per_doy
+        cache = self._get_percentile_cache()
+        if cache is not None:
+            content_key = get_content_key(da, **params)
+            per_doy_cached = cache.get(content_key)
+            if covers(per_doy_cached, per):
+                percentile_memo.put(key, per_doy_cached)
+                return per_doy_cached
+        per = set(per) | set(PERCENTILES.get(method, []))
+        if per_doy is not None:
+            per |= set(per_doy.percentiles.values)
+        per_doy = self._percentile_doy(da, sorted(per))
+        percentile_memo.put(key, per_doy)
+        if cache is not None:
+            cache.put(content_key, per_doy)
+        return per_doy
+
+    def _get_percentile(self, da, per, base_period_time_range, method=None):
         if isinstance(per, xr.Dataset):
             return per["per"]
         elif isinstance(per, xr.DataArray):
             return per
-        # tslice = slice(base_period_time_range[0], base_period_time_range[1])
         y_s = str(base_period_time_range[0])
         y_e = str(base_period_time_range[1])
         tslice = slice(y_s, y_e)
 
         base_period = da.sel(time=tslice)
-        with dask.config.set(**{"array.slicing.split_large_chunks": False}):
-            per_doy = percentile_doy(base_period, per=per)
-            per_doy_comp = per_doy.compute()
-        return per_doy_comp.sel(percentiles=per)
+        per_doy = self._get_percentile_doy(
+            base_period,
+            np.atleast_1d(per).tolist(),
+            method,
+            [y_s, y_e],
+        )
+        return per_doy.sel(percentiles=per)
 
     def _preprocessing(self, da, method=None, **kwargs):
         kwargs_ = deepcopy(kwargs)
@@ -106,27 +229,385 @@ class ClimateIndicator:
         return da
 
     def _get_percentiles(self, params, kwargs):
-        self.split_large_chunks = False
+        if self._options["percentile_engine"] == "xclim":
+            self.split_large_chunks = False
+        groups = {}
         for name_per, kwargs_dict in kwargs["percentiles"].items():
             if name_per in kwargs.keys():
                 if isinstance(kwargs[name_per], (xr.DataArray, xr.Dataset)):
                     continue
-            da = self._get_da(params, kwargs_dict["variable"])
+            group = (kwargs_dict["variable"], kwargs_dict["method"])
+            groups.setdefault(group, {})[name_per] = kwargs_dict["per"]
+        for (variable, method), pers in groups.items():
+            da = self._get_da(params, variable)
             da = self._preprocessing(
                 da,
-                method=kwargs_dict["method"],
+                method=method,
                 **kwargs,
             )
-            print("in es, base_period_time_range: ", kwargs["base_period_time_range"])
-            kwargs[name_per] = self._get_percentile(
-                da, kwargs_dict["per"], kwargs["base_period_time_range"]
+            per = [
+                p
+                for p in pers.values()
+                if not isinstance(p, (xr.DataArray, xr.Dataset))
+            ]
+            if per:
+                per_doy = self._get_percentile(
+                    da,
+                    per,
+                    kwargs["base_period_time_range"],
+                    method=method,
+                )
+            for name_per, p in pers.items():
+                if isinstance(p, (xr.DataArray, xr.Dataset)):
+                    kwargs[name_per] = self._get_percentile(
+                        da,
+                        p,
+                        kwargs["base_period_time_range"],
+                        method=method,
+                    )
+                else:
+                    kwargs[name_per] = per_doy.sel(percentiles=p)
+        return kwargs
+
+    def _get_template(self, params, kwargs):
+        """Apply xclim indicator to the first grid point only.
+
+        Dask-backed inputs stay lazy, so that the output is not computed.
+        Its attributes, name and scalar coordinates are the metadata xclim
+        gives the whole climate index.
+        """
+        if "percentiles" in kwargs.keys():
+            kwargs = self._get_percentiles(params, dict(kwargs))
+        parameters = signature(self.func).parameters.keys()
+        kwargs = {k: v for k, v in kwargs.items() if k in parameters}
+        dims = set()
+        for v in params.values():
+            if isinstance(v, xr.Dataset):
+                for var in v.data_vars.values():
+                    if "time" in var.dims:
+                        dims.update(var.dims)
+            elif isinstance(v, xr.DataArray) and "time" in v.dims:
+                dims.update(v.dims)
+        dims.discard("time")
+
+        def first_point(v):
+            if not isinstance(v, (xr.DataArray, xr.Dataset)):
+                return v
+            return v.isel({dim: slice(0, 1) for dim in dims if dim in v.dims})
+
+        return self.func(
+            **{k: first_point(v) for k, v in params.items()},
+            **{k: first_point(v) for k, v in kwargs.items()},
+        )
+
+    def _set_metadata(self, da, params, kwargs):
+        """Set metadata of the xclim indicator to `da`."""
+        template = self._get_template(params, kwargs)
+        da = da.copy(deep=False)
+        da.name = template.name
+        da.attrs = dict(template.attrs)
+        coords = {
+            k: v
+            for k, v in template.coords.items()
+            if v.ndim == 0 and k not in da.coords
+        }
+        return da.assign_coords(coords)
+
+    def _get_count_condition(self, kwargs):
+        thresh = self._count.get("thresh")
+        if "thresh" in kwargs.keys():
+            thresh = kwargs["thresh"]
+        elif thresh is None:
+            thresh = self._thresh_string(self.thresh, self.units["thresh"])
+        return (self._count["op"], thresh)
+
+    def _get_count_family(self, variable):
+        """Get default conditions of all threshold-count indices of `variable`."""
+        family = {}
+        for cls in ClimateIndicator.__subclasses__():
+            obj = cls()
+            if obj._count is None or obj._count["variable"] != variable:
+                continue
+            family[cls.__name__] = obj._get_count_condition({})
+        return family
+
+    def _compute_fused_count(self, params, kwargs):
+        """Select threshold count from all counts of the same variable.
+
+        All threshold-count indices of the input variable are evaluated
+        together in one reduction over the time axis and memoized, so
+        that computing the whole count family costs one single pass.
+        A user-defined threshold is counted as an additional family
+        member under its own label.
+        """
+        from ._kernels import threshold_counts
+
+        variable = self._count["variable"]
+        da = self._get_da(params, variable)
+        freq = params.get("freq", "YS")
+        condition = self._get_count_condition(kwargs)
+        family = self._get_count_family(variable)
+        name = type(self).__name__
+        if family.get(name) != condition:
+            name = "{} {}".format(*condition)
+            family[name] = condition
+        key = get_key(da, freq=freq, conditions=sorted(family.items()))
+        counts = count_memo.get(key)
+        if counts is None:
+            counts = threshold_counts(da, family, freq=freq)
+            count_memo.put(key, counts)
+        return self._set_metadata(counts[name], params, kwargs)
+
+    def _get_compound_family(self):
+        """Get conditions of all compound indices of the same variables."""
+        family = {}
+        for cls in ClimateIndicator.__subclasses__():
+            obj = cls()
+            if obj._compound is None or obj._compound.keys() != self._compound.keys():
+                continue
+            family[cls.__name__] = obj._compound
+        return family
+
+    def _compute_fused_compound(self, params, kwargs):
+        """Select compound count from all compound counts of the same variables.
+
+        The day-of-year percentiles of every input variable are looked up
+        once for all compound indices (e.g. CD, CW, WD, WW) and all of
+        their day counts are evaluated together in one reduction over the
+        time axis and memoized.
+        """
+        from ._kernels import compound_counts
+
+        methods = {
+            kwargs_dict["variable"]: kwargs_dict["method"]
+            for kwargs_dict in kwargs["percentiles"].values()
+        }
+        das = {variable: self._get_da(params, variable) for variable in methods}
+        freq = params.get("freq", "YS")
+        base_period_time_range = kwargs["base_period_time_range"]
+        family = self._get_compound_family()
+        variables = sorted(das)
+        key = get_key(
+            das[variables[0]],
+            freq=freq,
+            base_period_time_range=base_period_time_range,
+            conditions=sorted(family.items()),
+            variables=[get_key(das[variable]) for variable in variables[1:]],
+        )
+        counts = count_memo.get(key)
+        if counts is None:
+            thresholds = {}
+            for variable, method in methods.items():
+                per = sorted({cond[variable][1] for cond in family.values()})
+                da = self._preprocessing(das[variable], method=method, **kwargs)
+                per_doy = self._get_percentile(
+                    da, per, base_period_time_range, method=method
+                )
+                thresholds[variable] = {p: per_doy.sel(percentiles=p) for p in per}
+            counts = compound_counts(das, thresholds, family, freq=freq)
+            count_memo.put(key, counts)
+        return self._set_metadata(counts[type(self).__name__], params, kwargs)
+
+    def _get_spell_mask(self, params, kwargs):
+        from xclim.core.missing import missing_from_context
+        from xclim.core.units import convert_units_to, rate2amount
+        from xclim.indices.generic import compare, spell_mask
+
+        conds = []
+        masks = []
+        freq = params.get("freq", "YS")
+        window = kwargs.get("window", 1)
+        for variable, thresh in self._spell["thresh"].items():
+            da = self._get_da(params, variable)
+            masks.append(missing_from_context(da, freq))
+            thresh = kwargs.get(thresh, thresh)
+            if self._spell.get("accumulate") is True:
+                da = convert_units_to(da, "mm/d", context="hydro")
+                da = rate2amount(da, out_units="mm")
+                thresh = convert_units_to(thresh, da, context="hydro")
+                conds.append(spell_mask(da, window, "sum", self._spell["op"], thresh))
+                window = 1
+            else:
+                thresh = convert_units_to(thresh, da, context="hydro")
+                conds.append(compare(da, self._spell["op"], thresh))
+        cond = xr.concat(conds, dim="variable").all(dim="variable")
+        mask = xr.concat(masks, dim="variable").any(dim="variable")
+        return cond, window, mask
+
+    def _get_spell_thresholds(self, kwargs):
+        return {
+            variable: kwargs.get(thresh, thresh)
+            for variable, thresh in self._spell["thresh"].items()
+        }
+
+    def _get_spell_family(self, thresholds):
+        """Get minimum lengths of all spell indices sharing `thresholds`."""
+        windows = set()
+        for cls in ClimateIndicator.__subclasses__():
+            obj = cls()
+            if obj._spell is None or obj._spell.get("accumulate") is True:
+                continue
+            if obj._spell["op"] != self._spell["op"]:
+                continue
+            defaults = {thresh: None for thresh in obj._spell["thresh"].values()}
+            defaults = obj._add_units(obj._set_default_if_None(defaults))
+            if obj._get_spell_thresholds(defaults) != thresholds:
+                continue
+            windows.add(getattr(obj, "window", 1))
+        return windows
+
+    def _get_fused_spell_statistics(self, params, kwargs, cond, window, mask):
+        """Select spell statistics from all spell statistics of the same mask.
+
+        The runs of the spell mask are detected once for the minimum
+        lengths of all spell indices with the same variables, operator
+        and thresholds (e.g. HWf, HWx, HWn) and memoized, so that the
+        whole family shares one single pass.
+        """
+        from ._kernels import spell_statistics
+
+        freq = params.get("freq", "YS")
+        thresholds = self._get_spell_thresholds(kwargs)
+        das = [self._get_da(params, variable) for variable in sorted(thresholds)]
+        key = get_key(
+            das[0],
+            freq=freq,
+            op=self._spell["op"],
+            thresholds=sorted(thresholds.items()),
+            variables=[get_key(da) for da in das[1:]],
+        )
+        stats = spell_memo.get(key)
+        if stats is None or window not in stats.window.values:
+            windows = self._get_spell_family(thresholds) | {window}
+            if stats is not None:
+                windows |= set(stats.window.values.tolist())
+            stats = spell_statistics(cond, window=sorted(windows), freq=freq)
+            stats = stats.where(~mask)
+            spell_memo.put(key, stats)
+        return stats.sel(window=window, drop=True)
+
+    def _compute_spell(self, params, kwargs):
+        """Calculate spell statistic with compiled run-length kernel.
+
+        Instead of xclim's run-length encoding the spell mask is reduced
+        by a numba kernel that computes the maximum spell length, the
+        total number of days in spells and the number of spells of each
+        period in one pass.
+        """
+        from ._kernels import spell_statistics
+
+        backend = self._options["spell_backend"]
+        if backend != "numba":
+            raise ValueError(
+                f"Spell backend {backend} not supported. "
+                "Please select one of 'xclim' or 'numba'."
             )
+        cond, window, mask = self._get_spell_mask(params, kwargs)
+        if self._options["fused"] is True and self._spell.get("accumulate") is not True:
+            stats = self._get_fused_spell_statistics(params, kwargs, cond, window, mask)
+        else:
+            freq = params.get("freq", "YS")
+            stats = spell_statistics(cond, window=window, freq=freq).where(~mask)
+        return self._set_metadata(stats[self._spell["reducer"]], params, kwargs)
+
+    def _compute_bootstrap(self, params, kwargs, percentiles):
+        """Calculate percentile-based index with bootstrapped in-base years.
+
+        Equivalent to xclim's ``bootstrap=True``, but the percentiles of
+        all altered base periods of one in-base year are computed by a
+        compiled kernel sharing one sorted sample per day of year instead
+        of sorting every altered base period. Every year is an
+        independent dask task, so the years are computed in parallel.
+        """
+        from xclim.core.bootstrapping import BOOTSTRAP_DIM
+
+        from ._kernels import (
+            bootstrap_freq,
+            bootstrap_percentile_doy,
+            bootstrap_sources,
+        )
+
+        if len(percentiles) != 1:
+            raise ValueError("Bootstrapping needs exactly one percentile.")
+        ((name_per, per_dict),) = percentiles.items()
+        per_da = kwargs[name_per]
+        if "climatology_bounds" not in per_da.attrs:
+            raise ValueError(
+                f"Bootstrapping needs the attribute 'climatology_bounds' of {name_per}."
+            )
+        da = self._get_da(params, per_dict["variable"])
+        base = da.sel(time=slice(*per_da.attrs["climatology_bounds"]))
+        if base.time.size in [0, da.time.size]:
+            raise ValueError(
+                "Bootstrapping needs a base period overlapping the studied "
+                "period partly."
+            )
+        base = self._preprocessing(base, method=per_dict["method"], **kwargs)
+        if base.chunks is None:
+            base = base.chunk()
+        freq = bootstrap_freq(params.get("freq", "YS"))
+        sources = bootstrap_sources(base.time, freq)
+        per = np.atleast_1d(per_da.percentiles.values).tolist()
+        params = {**params, "bootstrap": False}
+        values = []
+        for label, group in da.resample(time=freq).groups.items():
+            year_params = {
+                k: v.isel(time=group) if "time" in getattr(v, "dims", []) else v
+                for k, v in params.items()
+            }
+            if label not in sources:
+                values.append(self.func(**year_params, **kwargs))
+                continue
+            start, source = sources[label]
+            per_bootstrap = bootstrap_percentile_doy(
+                base,
+                start,
+                source,
+                window=per_da.attrs["window"],
+                per=per,
+                alpha=per_da.attrs["alpha"],
+                beta=per_da.attrs["beta"],
+            )
+            if "percentiles" not in per_da.dims:
+                per_bootstrap = per_bootstrap.squeeze("percentiles")
+            per_bootstrap.attrs = per_da.attrs
+            value = self.func(**year_params, **{**kwargs, name_per: per_bootstrap})
+            values.append(value.mean(dim=BOOTSTRAP_DIM, keep_attrs=True))
+        return xr.concat(values, dim="time")
+
+    def _expand_percentiles(self, kwargs, percentiles):
+        """Add ``percentiles`` dimension of size one to scalar percentiles.
+
+        xclim's bootstrapping loses scalar percentiles of dask-backed
+        inputs. With a ``percentiles`` dimension of size one they are
+        kept and the dimension is squeezed from the output again.
+        """
+        kwargs = dict(kwargs)
+        for name_per in percentiles:
+            per_da = kwargs.get(name_per)
+            if isinstance(per_da, xr.DataArray) and "percentiles" not in per_da.dims:
+                kwargs[name_per] = per_da.expand_dims("percentiles", axis=-1)
         return kwargs
 
     def compute_climate_indicator(self, params, **kwargs):
+        self._options = self._get_options(params)
+        resize_memos(self._options["memo_size"])
+        if self._options["bootstrap"] is True:
+            params["bootstrap"] = True
         params = self._clean_up_params(params=params, func=self.func)
         kwargs = self._set_default_if_None(kwargs)
         kwargs = self._add_units(kwargs)
+        if self._options["fused"] is True and self._count is not None:
+            return self._compute_fused_count(params, kwargs)
+        if self._options["spell_backend"] != "xclim" and self._spell is not None:
+            return self._compute_spell(params, kwargs)
+        if (
+            self._options["fused"] is True
+            and self._compound is not None
+            and not any(name in kwargs for name in kwargs["percentiles"])
+        ):
+            return self._compute_fused_compound(params, kwargs)
+        percentiles = kwargs.get("percentiles", {})
         if "percentiles" in kwargs.keys():
             kwargs = self._get_percentiles(params, kwargs)
         if self.date_bounds is True:
@@ -136,12 +617,20 @@ class ClimateIndicator:
         kwargs = self._clean_up_params(
             params=kwargs, func=self.func, exceptions=["date_bounds"]
         )
+        bootstrap = params.get("bootstrap") is True
+        if bootstrap and self._options["percentile_engine"] == "partition":
+            return self._compute_bootstrap(params, kwargs, percentiles)
+        if bootstrap:
+            kwargs = self._expand_percentiles(kwargs, percentiles)
         if self.split_large_chunks is True:
-            return self.func(**params, **kwargs)
-        if self.split_large_chunks is False:
+            out = self.func(**params, **kwargs)
+        else:
             with dask.config.set(
                 **{
                     "array.slicing.split_large_chunks": False,
                 }
             ):
-                return self.func(**params, **kwargs)
+                out = self.func(**params, **kwargs)
+        if bootstrap:
+            out = out.squeeze("percentiles")
+        return out
@@ -33,3 +33,60 @@ _split = {
 }
 
 _base_period = ["1971", "2000"]
+
+_doy_window = 5
+
+_horizontal_dims = ["rlat", "rlon", "lat", "lon", "y", "x"]
+
+_chunk_budget = "128MB"
+
+_chunk_spatial = 50
+
+_encoding_profiles = {
+    "archive": {
+        "zlib": True,
+        "complevel": 9,
+        "shuffle": True,
+        "quantize_mode": "BitRound",
+        "significant_digits": 12,
+        "chunks": None,
+    },
+    "fast-read-timeseries": {
+        "zlib": True,
+        "complevel": 1,
+        "shuffle": True,
+        "chunks": {"time": -1, "horizontal": 16},
+    },
+    "fast-read-maps": {
+        "zlib": True,
+        "complevel": 1,
+        "shuffle": True,
+        "chunks": {"time": 1, "horizontal": -1},
+    },
+}
+
+_percentile_cache_size = "10GB"
+
+_memo_entries = 8
+
+_memo_size = "1GB"
+
+_journal_file = "index_calculator_journal.jsonl"
+
+_schedulers = ["synchronous", "threads", "processes", "local", "distributed"]
+
+_percentiles = {
+    "temperature": [10, 25, 75, 90],
+    "precipitation": [25, 75, 90, 95, 99],
+}
+
+_options = {
+    "percentile_cache": None,
+    "percentile_cache_size": _percentile_cache_size,
+    "memo_size": _memo_size,
+    "fused": None,
+    "spell_backend": "xclim",
+    "percentile_engine": "xclim",
+    "percentile_doy_block": None,
+    "bootstrap": False,
+}
@@ -1,5 +1,3 @@
-import xclim as xc
-
 from ._climate_indicator import ClimateIndicator
 
 
@@ -8,7 +6,8 @@ class CD(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.cold_and_dry_days
+        self.func = "atmos.cold_and_dry_days"
+        self._compound = {"tas": ("<", 25), "pr": ("<", 25)}
 
     def compute(
         self,
@@ -74,7 +73,8 @@ class CDD(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.maximum_consecutive_dry_days
+        self.func = "atmos.maximum_consecutive_dry_days"
+        self._spell = {"thresh": {"pr": "thresh"}, "op": "<", "reducer": "max"}
 
     def compute(self, thresh=None, **params):
         """Calculate maximum consecutive dry days.
@@ -104,7 +104,8 @@ class CFD(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.consecutive_frost_days
+        self.func = "atmos.consecutive_frost_days"
+        self._spell = {"thresh": {"tasmin": "0 degC"}, "op": "<", "reducer": "max"}
 
     def compute(self, **params):
         """Calculate maximum number of consecutive frost days.
@@ -129,7 +130,8 @@ class CHDYYx(ClimateIndicator):
         super().__init__()
         self.thresh = 30
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.maximum_consecutive_warm_days
+        self.func = "atmos.maximum_consecutive_warm_days"
+        self._spell = {"thresh": {"tasmax": "thresh"}, "op": ">", "reducer": "max"}
 
     def compute(self, thresh=None, **params):
         """Calculate maximum number of consecutive heat days.
@@ -160,7 +162,7 @@ class CSDI(ClimateIndicator):
     def __init__(self):
         super().__init__()
         self.window = 6
-        self.func = xc.atmos.cold_spell_duration_index
+        self.func = "atmos.cold_spell_duration_index"
 
     def compute(
         self,
@@ -217,7 +219,8 @@ class CSU(ClimateIndicator):
         super().__init__()
         self.thresh = 25
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.maximum_consecutive_warm_days
+        self.func = "atmos.maximum_consecutive_warm_days"
+        self._spell = {"thresh": {"tasmax": "thresh"}, "op": ">", "reducer": "max"}
 
     def compute(self, thresh=None, **params):
         """Calculate maximum consecutive summer days.
@@ -247,7 +250,8 @@ class CW(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.cold_and_wet_days
+        self.func = "atmos.cold_and_wet_days"
+        self._compound = {"tas": ("<", 25), "pr": (">", 75)}
 
     def compute(
         self,
@@ -313,7 +317,8 @@ class CWD(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.maximum_consecutive_wet_days
+        self.func = "atmos.maximum_consecutive_wet_days"
+        self._spell = {"thresh": {"pr": "thresh"}, "op": ">=", "reducer": "max"}
 
     def compute(self, thresh=None, **params):
         """Calculate maximum consecutive wet days.
@@ -345,7 +350,8 @@ class DD(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.dry_days
+        self.func = "atmos.dry_days"
+        self._count = {"variable": "pr", "op": "<"}
 
     def compute(self, thresh=None, **params):
         """Calculate number of dry days.
@@ -378,7 +384,13 @@ class DSf(ClimateIndicator):
         self.thresh = 1
         self.window = 3
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.dry_spell_frequency
+        self.func = "atmos.dry_spell_frequency"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": "<",
+            "reducer": "count",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate number of dry spells.
@@ -416,7 +428,13 @@ class DSx(ClimateIndicator):
         self.thresh = 1
         self.window = 1
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.dry_spell_max_length
+        self.func = "atmos.dry_spell_max_length"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": "<",
+            "reducer": "max",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate maximum length of dry spells.
@@ -455,7 +473,13 @@ class DSn(ClimateIndicator):
         self.thresh = 1
         self.window = 3
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.dry_spell_total_length
+        self.func = "atmos.dry_spell_total_length"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": "<",
+            "reducer": "sum",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate total number of days in dry spells.
@@ -494,7 +518,13 @@ class WSf(ClimateIndicator):
         self.thresh = 1
         self.window = 3
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.wet_spell_frequency
+        self.func = "atmos.wet_spell_frequency"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": ">=",
+            "reducer": "count",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate number of wet spells.
@@ -532,7 +562,13 @@ class WSx(ClimateIndicator):
         self.thresh = 1
         self.window = 1
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.wet_spell_max_length
+        self.func = "atmos.wet_spell_max_length"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": ">=",
+            "reducer": "max",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate maximum length of wet spells.
@@ -571,7 +607,13 @@ class WSn(ClimateIndicator):
         self.thresh = 1
         self.window = 3
         self.units = {"thresh": "mm"}
-        self.func = xc.atmos.wet_spell_total_length
+        self.func = "atmos.wet_spell_total_length"
+        self._spell = {
+            "thresh": {"pr": "thresh"},
+            "op": ">=",
+            "reducer": "sum",
+            "accumulate": True,
+        }
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate total number of days in wet spells.
@@ -607,7 +649,7 @@ class DTR(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.daily_temperature_range
+        self.func = "atmos.daily_temperature_range"
 
     def compute(self, **params):
         """Calculate mean of daily temperature range.
@@ -630,7 +672,8 @@ class FD(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.frost_days
+        self.func = "atmos.frost_days"
+        self._count = {"variable": "tasmin", "op": "<", "thresh": "0 degC"}
 
     def compute(self, **params):
         """Calculate number of frost days (tasmin < 0.0 degC).
@@ -656,7 +699,7 @@ class LFD(ClimateIndicator):
         self.start_date = "04-01"
         self.end_date = "06-30"
         self.date_bounds = True
-        self.func = xc.atmos.late_frost_days
+        self.func = "atmos.late_frost_days"
 
     def compute(self, start_date=None, end_date=None, **params):
         """Calculate number of late frost days (tasmin < 0.0 degC).
@@ -689,7 +732,8 @@ class ID(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.ice_days
+        self.func = "atmos.ice_days"
+        self._count = {"variable": "tasmax", "op": "<", "thresh": "0 degC"}
 
     def compute(self, **params):
         """Calculate number of ice days (tasmax < 0.0 degC).
@@ -714,7 +758,7 @@ class GD(ClimateIndicator):
         super().__init__()
         self.thresh = 4
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.growing_degree_days
+        self.func = "atmos.growing_degree_days"
 
     def compute(self, thresh=None, **params):
         """Calculate cumulative growing degree days (tas > thresh).
@@ -743,7 +787,7 @@ class HD17(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.heating_degree_days
+        self.func = "atmos.heating_degree_days"
 
     def compute(self, **params):
         """Calculate cumulative heating degree days (tas < 17 degC).
@@ -768,7 +812,7 @@ class PRCPTOT(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.wet_precip_accumulation
+        self.func = "atmos.wet_precip_accumulation"
 
     def compute(self, thresh=None, **params):
         """Calculate total precipitation amount.
@@ -798,7 +842,7 @@ class RR(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.precip_accumulation
+        self.func = "atmos.precip_accumulation"
 
     def compute(self, **params):
         """Calculate total precipitation.
@@ -821,7 +865,7 @@ class RRm(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.precip_average
+        self.func = "atmos.precip_average"
 
     def compute(self, **params):
         """Calculate mean daily precipitation.
@@ -844,7 +888,8 @@ class RR1(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.wetdays
+        self.func = "atmos.wetdays"
+        self._count = {"variable": "pr", "op": ">=", "thresh": "1 mm/day"}
 
     def compute(self, **params):
         """Calculate number of wet days (pr >= 1 mm/day).
@@ -867,7 +912,8 @@ class R10mm(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.wetdays
+        self.func = "atmos.wetdays"
+        self._count = {"variable": "pr", "op": ">=", "thresh": "10 mm/day"}
 
     def compute(self, **params):
         """Calculate number of wet days (pr >= 10 mm/day).
@@ -893,7 +939,8 @@ class R20mm(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.wetdays
+        self.func = "atmos.wetdays"
+        self._count = {"variable": "pr", "op": ">=", "thresh": "20 mm/day"}
 
     def compute(self, **params):
         """Calculate number of wet days (pr >= 20 mm/day).
@@ -919,7 +966,8 @@ class R25mm(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.wetdays
+        self.func = "atmos.wetdays"
+        self._count = {"variable": "pr", "op": ">=", "thresh": "25 mm/day"}
 
     def compute(self, **params):
         """Calculate number of wet days (pr >= 25 mm/day).
@@ -1002,7 +1050,7 @@ class RYYp(ClimateIndicator):
         self.per = 75
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.days_over_precip_doy_thresh
+        self.func = "atmos.days_over_precip_doy_thresh"
 
     def compute(
         self,
@@ -1059,7 +1107,8 @@ class RYYmm(ClimateIndicator):
         super().__init__()
         self.thresh = 25
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.wetdays
+        self.func = "atmos.wetdays"
+        self._count = {"variable": "pr", "op": ">="}
 
     def compute(self, thresh=None, **params):
         """Calculate number of wet days.
@@ -1089,7 +1138,7 @@ class RX1day(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.max_1day_precipitation_amount
+        self.func = "atmos.max_1day_precipitation_amount"
 
     def compute(self, **params):
         """Calculate maximum 1-day total precipitation.
@@ -1113,7 +1162,7 @@ class RXYYday(ClimateIndicator):
     def __init__(self):
         super().__init__()
         self.window = 5
-        self.func = xc.atmos.max_n_day_precipitation_amount
+        self.func = "atmos.max_n_day_precipitation_amount"
 
     def compute(self, window=None, **params):
         """Calculate maximum {window}-day total precipitation.
@@ -1144,7 +1193,7 @@ class RYYpTOT(ClimateIndicator):
         self.per = 75
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.fraction_over_precip_thresh
+        self.func = "atmos.fraction_over_precip_thresh"
 
     def compute(
         self,
@@ -1202,7 +1251,7 @@ class SDII(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.daily_pr_intensity
+        self.func = "atmos.daily_pr_intensity"
 
     def compute(self, thresh=None, **params):
         """Calculate average precipitation during wet days.
@@ -1234,7 +1283,8 @@ class SU(ClimateIndicator):
         super().__init__()
         self.thresh = 25
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.tx_days_above
+        self.func = "atmos.tx_days_above"
+        self._count = {"variable": "tasmax", "op": ">"}
 
     def compute(self, thresh=None, **params):
         """Calculate number of summer days.
@@ -1266,7 +1316,7 @@ class CMD(ClimateIndicator):
         super().__init__()
         self.thresh = 2
         self.units = {"thresh": "m s-1"}
-        self.func = xc.atmos.calm_days
+        self.func = "atmos.calm_days"
 
     def compute(self, thresh=None, **params):
         """Calculate number of calm days.
@@ -1299,7 +1349,8 @@ class SQI(ClimateIndicator):
         super().__init__()
         self.thresh = 18
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.tn_days_above
+        self.func = "atmos.tn_days_above"
+        self._count = {"variable": "tasmin", "op": ">"}
 
     def compute(self, thresh=None, **params):
         """Calculate number of uncomfortable sleep events.
@@ -1329,7 +1380,7 @@ class TG(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tg_mean
+        self.func = "atmos.tg_mean"
 
     def compute(self, **params):
         """Calculate mean daily mean temperature.
@@ -1353,7 +1404,7 @@ class TG10p(ClimateIndicator):
     def __init__(self):
         super().__init__()
         self.tas_per = None
-        self.func = xc.atmos.tg10p
+        self.func = "atmos.tg10p"
 
     def compute(
         self,
@@ -1402,7 +1453,7 @@ class TG90p(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tg90p
+        self.func = "atmos.tg90p"
 
     def compute(
         self,
@@ -1453,7 +1504,8 @@ class TR(ClimateIndicator):
         super().__init__()
         self.thresh = 20
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.tn_days_above
+        self.func = "atmos.tn_days_above"
+        self._count = {"variable": "tasmin", "op": ">"}
 
     def compute(self, thresh=None, **params):
         """Calculate number of tropical nights.
@@ -1483,7 +1535,7 @@ class TX(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tx_mean
+        self.func = "atmos.tx_mean"
 
     def compute(self, **params):
         """Calculate mean daily maximum temperature.
@@ -1506,7 +1558,7 @@ class TX10p(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tx10p
+        self.func = "atmos.tx10p"
 
     def compute(
         self,
@@ -1555,7 +1607,7 @@ class TX90p(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tx90p
+        self.func = "atmos.tx90p"
 
     def compute(
         self,
@@ -1604,7 +1656,7 @@ class TXn(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tx_min
+        self.func = "atmos.tx_min"
 
     def compute(self, **params):
         """Calculate minimum daily maximum temperature.
@@ -1627,7 +1679,7 @@ class TXx(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tx_max
+        self.func = "atmos.tx_max"
 
     def compute(self, **params):
         """Calculate maximum daily maximum temperature.
@@ -1650,7 +1702,7 @@ class TN(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tn_mean
+        self.func = "atmos.tn_mean"
 
     def compute(self, **params):
         """Calculate mean daily minimum temperature.
@@ -1673,7 +1725,7 @@ class TN10p(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tn10p
+        self.func = "atmos.tn10p"
 
     def compute(
         self,
@@ -1722,7 +1774,7 @@ class TN90p(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tn90p
+        self.func = "atmos.tn90p"
 
     def compute(
         self,
@@ -1771,7 +1823,7 @@ class TNn(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tn_min
+        self.func = "atmos.tn_min"
 
     def compute(self, **params):
         """Calculate minimum daily minimum temperature.
@@ -1794,7 +1846,7 @@ class TNx(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.tn_max
+        self.func = "atmos.tn_max"
 
     def compute(self, **params):
         """Calculate maximum daily minimum temperature.
@@ -1817,7 +1869,8 @@ class WD(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.warm_and_dry_days
+        self.func = "atmos.warm_and_dry_days"
+        self._compound = {"tas": (">", 75), "pr": ("<", 25)}
 
     def compute(
         self,
@@ -1882,7 +1935,7 @@ class WSDI(ClimateIndicator):
     def __init__(self):
         super().__init__()
         self.window = 6
-        self.func = xc.atmos.warm_spell_duration_index
+        self.func = "atmos.warm_spell_duration_index"
 
     def compute(
         self,
@@ -1937,7 +1990,8 @@ class WW(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.warm_and_wet_days
+        self.func = "atmos.warm_and_wet_days"
+        self._compound = {"tas": (">", 75), "pr": (">", 75)}
 
     def compute(
         self,
@@ -2004,7 +2058,8 @@ class CSf(ClimateIndicator):
         self.thresh = -10
         self.window = 3
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.cold_spell_frequency
+        self.func = "atmos.cold_spell_frequency"
+        self._spell = {"thresh": {"tas": "thresh"}, "op": "<", "reducer": "count"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate number of cold spells.
@@ -2043,7 +2098,8 @@ class CSx(ClimateIndicator):
         self.thresh = -10
         self.window = 1
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.cold_spell_max_length
+        self.func = "atmos.cold_spell_max_length"
+        self._spell = {"thresh": {"tas": "thresh"}, "op": "<", "reducer": "max"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate maximum length of cold spells.
@@ -2082,7 +2138,8 @@ class CSn(ClimateIndicator):
         self.thresh = -10
         self.window = 3
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.cold_spell_total_length
+        self.func = "atmos.cold_spell_total_length"
+        self._spell = {"thresh": {"tas": "thresh"}, "op": "<", "reducer": "sum"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate total number of days in cold spells.
@@ -2121,7 +2178,8 @@ class HSf(ClimateIndicator):
         self.thresh = 35
         self.window = 3
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.hot_spell_frequency
+        self.func = "atmos.hot_spell_frequency"
+        self._spell = {"thresh": {"tasmax": "thresh"}, "op": ">", "reducer": "count"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate number of hot spells.
@@ -2160,7 +2218,8 @@ class HSx(ClimateIndicator):
         self.thresh = 35
         self.window = 1
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.hot_spell_max_length
+        self.func = "atmos.hot_spell_max_length"
+        self._spell = {"thresh": {"tasmax": "thresh"}, "op": ">", "reducer": "max"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate maximum lenght of hot spells.
@@ -2199,7 +2258,8 @@ class HSn(ClimateIndicator):
         self.thresh = 35
         self.window = 3
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.hot_spell_total_length
+        self.func = "atmos.hot_spell_total_length"
+        self._spell = {"thresh": {"tasmax": "thresh"}, "op": ">", "reducer": "sum"}
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate total number of days in hot spells.
@@ -2237,7 +2297,7 @@ class SD(ClimateIndicator):
         super().__init__()
         self.low = 1
         self.units = {"low": "mm/day"}
-        self.func = xc.atmos.days_with_snow
+        self.func = "atmos.days_with_snow"
 
     def compute(self, low=None, **params):
         """Calculate number of snow days.
@@ -2270,7 +2330,7 @@ class SCD(ClimateIndicator):
         super().__init__()
         self.thresh = 3
         self.units = {"thresh": "cm"}
-        self.func = xc.land.snd_season_length
+        self.func = "land.snd_season_length"
 
     def compute(
         self,
@@ -2301,7 +2361,7 @@ class Sint(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.snowfall_intensity
+        self.func = "atmos.snowfall_intensity"
 
     def compute(self, thresh=None, **params):
         """Calculate snowfall intensity.
@@ -2333,7 +2393,7 @@ class Sfreq(ClimateIndicator):
         super().__init__()
         self.thresh = 1
         self.units = {"thresh": "mm/day"}
-        self.func = xc.atmos.snowfall_frequency
+        self.func = "atmos.snowfall_frequency"
 
     def compute(self, thresh=None, **params):
         """Calculate snowfall frequency.
@@ -2365,7 +2425,7 @@ class UTCI(ClimateIndicator):
         super().__init__()
         self.stat = "sunlit"
         self.mask_invalid = True
-        self.func = xc.indicators.convert.universal_thermal_climate_index
+        self.func = "indicators.convert.universal_thermal_climate_index"
 
     def compute(self, stat=None, mask_invalid=None, **params):
         """Calculate universal thermal climate index.
@@ -2412,7 +2472,8 @@ class WI(ClimateIndicator):
         super().__init__()
         self.thresh = -10
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.tn_days_below
+        self.func = "atmos.tn_days_below"
+        self._count = {"variable": "tasmin", "op": "<"}
 
     def compute(self, thresh=None, **params):
         """Calculate number of winter days.
@@ -2446,7 +2507,12 @@ class HWf(ClimateIndicator):
         self.thresh_tasmax = 30
         self.window = 3
         self.units = {"thresh_tasmin": "degC", "thresh_tasmax": "degC"}
-        self.func = xc.atmos.heat_wave_frequency
+        self.func = "atmos.heat_wave_frequency"
+        self._spell = {
+            "thresh": {"tasmin": "thresh_tasmin", "tasmax": "thresh_tasmax"},
+            "op": ">",
+            "reducer": "count",
+        }
 
     def compute(
         self,
@@ -2500,7 +2566,12 @@ class HWx(ClimateIndicator):
         self.thresh_tasmax = 30
         self.window = 1
         self.units = {"thresh_tasmin": "degC", "thresh_tasmax": "degC"}
-        self.func = xc.atmos.heat_wave_max_length
+        self.func = "atmos.heat_wave_max_length"
+        self._spell = {
+            "thresh": {"tasmin": "thresh_tasmin", "tasmax": "thresh_tasmax"},
+            "op": ">",
+            "reducer": "max",
+        }
 
     def compute(
         self,
@@ -2554,7 +2625,12 @@ class HWn(ClimateIndicator):
         self.thresh_tasmax = 30
         self.window = 3
         self.units = {"thresh_tasmin": "degC", "thresh_tasmax": "degC"}
-        self.func = xc.atmos.heat_wave_total_length
+        self.func = "atmos.heat_wave_total_length"
+        self._spell = {
+            "thresh": {"tasmin": "thresh_tasmin", "tasmax": "thresh_tasmax"},
+            "op": ">",
+            "reducer": "sum",
+        }
 
     def compute(
         self,
@@ -2607,7 +2683,7 @@ class GSS(ClimateIndicator):
         self.thresh = 5
         self.window = 5
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.growing_season_start
+        self.func = "atmos.growing_season_start"
 
     def compute(self, thresh=None, window=None, mid_date=None, **params):
         """Calculate growing season start.
@@ -2648,7 +2724,7 @@ class GSE(ClimateIndicator):
         self.thresh = 5
         self.window = 5
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.growing_season_end
+        self.func = "atmos.growing_season_end"
 
     def compute(self, thresh=None, window=None, mid_date=None, **params):
         """Calculate growing season end.
@@ -2691,7 +2767,7 @@ class GSL(ClimateIndicator):
         self.mid_date = "07-01"
         self.freq = "YS"
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.growing_season_length
+        self.func = "atmos.growing_season_length"
 
     def compute(self, thresh=None, window=None, mid_date=None, **params):
         """Calculate growing season length.
@@ -2731,7 +2807,7 @@ class FFS(ClimateIndicator):
         self.thresh = 0
         self.window = 5
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.frost_free_season_start
+        self.func = "atmos.frost_free_season_start"
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate frost free season start.
@@ -2769,7 +2845,7 @@ class FFE(ClimateIndicator):
         self.thresh = 0
         self.window = 5
         self.units = {"thresh": "degC"}
-        self.func = xc.atmos.frost_free_season_end
+        self.func = "atmos.frost_free_season_end"
 
     def compute(self, thresh=None, window=None, **params):
         """Calculate frost free season end.
@@ -2804,7 +2880,7 @@ class FG(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWind_mean
+        self.func = "atmos.sfcWind_mean"
 
     def compute(self, **params):
         """Calculate mean daily mean wind speed.
@@ -2830,7 +2906,7 @@ class FGn(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWind_min
+        self.func = "atmos.sfcWind_min"
 
     def compute(self, **params):
         """Calculate minimum daily mean wind speed.
@@ -2856,7 +2932,7 @@ class FGx(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWind_max
+        self.func = "atmos.sfcWind_max"
 
     def compute(self, **params):
         """Calculate maximum daily mean wind speed.
@@ -2882,7 +2958,7 @@ class FX(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWindmax_mean
+        self.func = "atmos.sfcWindmax_mean"
 
     def compute(self, **params):
         """Calculate mean daily maximum wind speed.
@@ -2905,7 +2981,7 @@ class FXn(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWindmax_min
+        self.func = "atmos.sfcWindmax_min"
 
     def compute(self, **params):
         """Calculate minimum daily maximum wind speed.
@@ -2928,7 +3004,7 @@ class FXx(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.atmos.sfcWindmax_max
+        self.func = "atmos.sfcWindmax_max"
 
     def compute(self, **params):
         """Calculate maximum daily maximum wind speed.
@@ -2954,7 +3030,7 @@ class HI(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.convert.heat_index
+        self.func = "convert.heat_index"
 
     def compute(self, **params):
         """
@@ -2984,7 +3060,7 @@ class HIX(ClimateIndicator):
 
     def __init__(self):
         super().__init__()
-        self.func = xc.indicators.convert.humidex
+        self.func = "indicators.convert.humidex"
 
     def compute(self, **params):
         """
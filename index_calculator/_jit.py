@@ -0,0 +1,331 @@
+import numpy as np
+from numba import njit
+
+
+@njit(nogil=True, cache=False)
+def _run_length_statistics(cond, starts, ends, windows):
+    """Maximum length, total length and number of runs per period.
+
+    Every run is detected once and counted for all minimum lengths
+    `windows` it reaches.
+    """
+    npoints = cond.shape[0]
+    nperiods = starts.shape[0]
+    nwindows = windows.shape[0]
+    max_length = np.zeros((nwindows, npoints, nperiods))
+    total_length = np.zeros((nwindows, npoints, nperiods))
+    frequency = np.zeros((nwindows, npoints, nperiods))
+    for i in range(npoints):
+        for p in range(nperiods):
+            run = 0
+            for t in range(starts[p], ends[p] + 1):
+                if t < ends[p] and cond[i, t]:
+                    run += 1
+                    continue
+                for w in range(nwindows):
+                    if run >= windows[w]:
+                        max_length[w, i, p] = max(max_length[w, i, p], run)
+                        total_length[w, i, p] += run
+                        frequency[w, i, p] += 1
+                run = 0
+    return max_length, total_length, frequency
+
+
+@njit(nogil=True, cache=False)
+def _select(buffer, lo, hi, k):
+    """Move the k-th smallest value of buffer[lo:hi] to position k in place.
+
+    Smaller values end up left, larger values right of position k.
+    """
+    hi -= 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        # median of three pivot
+        if buffer[mid] < buffer[lo]:
+            buffer[mid], buffer[lo] = buffer[lo], buffer[mid]
+        if buffer[hi] < buffer[lo]:
+            buffer[hi], buffer[lo] = buffer[lo], buffer[hi]
+        if buffer[hi] < buffer[mid]:
+            buffer[hi], buffer[mid] = buffer[mid], buffer[hi]
+        pivot = buffer[mid]
+        i = lo
+        j = hi
+        while i <= j:
+            while buffer[i] < pivot:
+                i += 1
+            while pivot < buffer[j]:
+                j -= 1
+            if i <= j:
+                buffer[i], buffer[j] = buffer[j], buffer[i]
+                i += 1
+                j -= 1
+        if k <= j:
+            hi = j
+        elif k >= i:
+            lo = i
+        else:
+            return
+
+
+@njit(nogil=True, cache=False)
+def _select_quantiles(arr, samples, quantiles, alpha, beta):
+    """Quantiles of the valid samples of each point and day of year.
+
+    The quantiles are interpolated exactly as xclim's ``_nan_quantile``
+    does, but the neighbouring order statistics are selected in place
+    (quickselect) from one sample at a time instead of sorting the whole
+    stacked array. `quantiles` have to be sorted.
+    """
+    npoints = arr.shape[0]
+    ndoys, nsamples = samples.shape
+    nquantiles = quantiles.size
+    out = np.full((npoints, ndoys, nquantiles), np.nan)
+    buffer = np.empty(nsamples, dtype=arr.dtype)
+    virtual = np.empty(nquantiles)
+    kth = np.empty(2 * nquantiles, dtype=np.int64)
+    for i in range(npoints):
+        for d in range(ndoys):
+            n = 0
+            for k in range(nsamples):
+                t = samples[d, k]
+                if t < 0:
+                    break
+                value = arr[i, t]
+                if not np.isnan(value):
+                    buffer[n] = value
+                    n += 1
+            if n == 0:
+                continue
+            if n == 1:
+                out[i, d, :] = buffer[0]
+                continue
+            for q in range(nquantiles):
+                v = n * quantiles[q] + (alpha + quantiles[q] * (1 - alpha - beta)) - 1
+                virtual[q] = v
+                if v >= n - 1:
+                    kth[2 * q] = kth[2 * q + 1] = n - 1
+                elif v < 0:
+                    kth[2 * q] = kth[2 * q + 1] = 0
+                else:
+                    kth[2 * q] = int(np.floor(v))
+                    kth[2 * q + 1] = kth[2 * q] + 1
+            # quantiles are sorted, so every selection only needs to
+            # search right of the previous order statistic
+            lo = 0
+            for k in kth:
+                if k >= lo:
+                    _select(buffer, lo, n, k)
+                    lo = k + 1
+            for q in range(nquantiles):
+                left = buffer[kth[2 * q]]
+                right = buffer[kth[2 * q + 1]]
+                diff = right - left
+                gamma = virtual[q] - kth[2 * q]
+                if gamma >= 0.5:
+                    out[i, d, q] = right - diff * (1 - gamma)
+                else:
+                    out[i, d, q] = left + diff * gamma
+    return out
+
+
+@njit(nogil=True, cache=False)
+def _order_statistics(m, quantile, alpha, beta):
+    """Get the neighbouring order statistics and the virtual index."""
+    v = m * quantile + (alpha + quantile * (1 - alpha - beta)) - 1
+    if v >= m - 1:
+        return m - 1, m - 1, v
+    if v < 0:
+        return 0, 0, v
+    prev = int(np.floor(v))
+    return prev, prev + 1, v
+
+
+@njit(nogil=True, cache=False)
+def _kth_replaced(window, lo, removed, nremoved, nbelow, added, nadded, k):
+    """Get the k-th smallest value of a replaced sample.
+
+    The sample is a partially sorted sample without some removed values
+    plus the sorted values `added`. `window` holds its sorted order
+    statistics from rank `lo` on, preceded by `lo` smaller values of which
+    `nbelow` are removed. `removed` are the removed positions in `window`.
+    """
+    nwindow = window.size
+    c = lo - nbelow
+    a = 0
+    if lo > 0:
+        while a < nadded and added[a] < window[0]:
+            a += 1
+        c += a
+    j = 0
+    r = 0
+    while True:
+        if j < nwindow and r < nremoved and removed[r] == j:
+            r += 1
+            j += 1
+            continue
+        if a < nadded and (j >= nwindow or added[a] < window[j]):
+            value = added[a]
+            a += 1
+        else:
+            value = window[j]
+            j += 1
+        if c == k:
+            return value
+        c += 1
+
+
+@njit(nogil=True, cache=False)
+def _bootstrap_quantiles(arr, samples, start, source, quantiles, alpha, beta):
+    """Quantiles of all bootstrapped base periods of one year.
+
+    The samples of the replicates differ from the moving window sample
+    only by the few time steps of the replaced year. So, the order
+    statistic of a replicate is at most that many ranks away from the one
+    of the sample. Only this narrow window of ranks is selected (see
+    :func:`_select`) and sorted once, the replicates merge their
+    replacement values into it.
+    """
+    npoints = arr.shape[0]
+    ndoys, nsamples = samples.shape
+    nreplicates, nbloc = source.shape
+    nquantiles = quantiles.size
+    out = np.full((npoints, nreplicates, ndoys, nquantiles), np.nan)
+    buffer = np.empty(nsamples, dtype=arr.dtype)
+    slots = np.empty(nsamples, dtype=np.int64)
+    replaced = np.empty(nsamples, dtype=arr.dtype)
+    added = np.empty(nsamples, dtype=arr.dtype)
+    lower = np.empty(nquantiles, dtype=np.int64)
+    upper = np.empty(nquantiles, dtype=np.int64)
+    removed = np.empty((nquantiles, nsamples), dtype=np.int64)
+    nremoved = np.empty(nquantiles, dtype=np.int64)
+    nbelow = np.empty(nquantiles, dtype=np.int64)
+    for i in range(npoints):
+        for d in range(ndoys):
+            n = 0
+            nslots = 0
+            nreplaced = 0
+            for k in range(nsamples):
+                t = samples[d, k]
+                if t < 0:
+                    break
+                in_bloc = start <= t < start + nbloc
+                if in_bloc:
+                    slots[nslots] = t - start
+                    nslots += 1
+                value = arr[i, t]
+                if np.isnan(value):
+                    continue
+                buffer[n] = value
+                n += 1
+                if in_bloc:
+                    # insertion sort of the few replaced values
+                    p = nreplaced
+                    while p > 0 and replaced[p - 1] > value:
+                        replaced[p] = replaced[p - 1]
+                        p -= 1
+                    replaced[p] = value
+                    nreplaced += 1
+            if n - nreplaced + nslots == 0:
+                continue
+            # ranks of the order statistics of all replicates
+            done = 0
+            for q in range(nquantiles):
+                kmin = _order_statistics(
+                    max(n - nreplaced, 1), quantiles[q], alpha, beta
+                )[0]
+                kmax = _order_statistics(
+                    n - nreplaced + nslots, quantiles[q], alpha, beta
+                )[1]
+                lower[q] = max(kmin - nslots, 0)
+                upper[q] = min(kmax + nreplaced, n - 1)
+                if upper[q] < lower[q]:
+                    continue
+                lo = max(lower[q], done)
+                if lo < n:
+                    _select(buffer, done, n, lo)
+                    if upper[q] > lo:
+                        _select(buffer, lo + 1, n, upper[q])
+                        for p in range(lo + 2, upper[q]):
+                            value = buffer[p]
+                            j = p
+                            while j > lo + 1 and buffer[j - 1] > value:
+                                buffer[j] = buffer[j - 1]
+                                j -= 1
+                            buffer[j] = value
+                done = max(done, upper[q] + 1)
+                # ranks of the replaced values, equal values are removed
+                # from the lowest ranks
+                nremoved[q] = 0
+                nbelow[q] = 0
+                j = lower[q]
+                for r in range(nreplaced):
+                    value = replaced[r]
+                    if value < buffer[lower[q]]:
+                        nbelow[q] += 1
+                        continue
+                    while j <= upper[q] and buffer[j] < value:
+                        j += 1
+                    rank = j
+                    if value == buffer[lower[q]]:
+                        rank = 0
+                        for p in range(lower[q]):
+                            if buffer[p] < value:
+                                rank += 1
+                    p = r
+                    while p > 0 and replaced[p - 1] == value:
+                        rank += 1
+                        p -= 1
+                    if rank < lower[q]:
+                        nbelow[q] += 1
+                    elif rank <= upper[q]:
+                        removed[q, nremoved[q]] = rank - lower[q]
+                        nremoved[q] += 1
+            for b in range(nreplicates):
+                nadded = 0
+                for s in range(nslots):
+                    t = source[b, slots[s]]
+                    if t < 0:
+                        continue
+                    value = arr[i, t]
+                    if np.isnan(value):
+                        continue
+                    # insertion sort of the few replacement values
+                    p = nadded
+                    while p > 0 and added[p - 1] > value:
+                        added[p] = added[p - 1]
+                        p -= 1
+                    added[p] = value
+                    nadded += 1
+                m = n - nreplaced + nadded
+                if m == 0:
+                    continue
+                for q in range(nquantiles):
+                    prev, nxt, v = _order_statistics(m, quantiles[q], alpha, beta)
+                    window = buffer[lower[q] : upper[q] + 1]
+                    left = _kth_replaced(
+                        window,
+                        lower[q],
+                        removed[q],
+                        nremoved[q],
+                        nbelow[q],
+                        added,
+                        nadded,
+                        prev,
+                    )
+                    right = _kth_replaced(
+                        window,
+                        lower[q],
+                        removed[q],
+                        nremoved[q],
+                        nbelow[q],
+                        added,
+                        nadded,
+                        nxt,
+                    )
+                    diff = right - left
+                    gamma = v - prev
+                    if gamma >= 0.5:
+                        out[i, b, d, q] = right - diff * (1 - gamma)
+                    else:
+                        out[i, b, d, q] = left + diff * gamma
+    return out
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import UTC, datetime
+
+
+def get_task_key(files, index, freq, project):
+    """Get unique key of one batch task."""
+    files = sorted(os.path.abspath(f) for f in files)
+    return json.dumps([files, index, freq, project])
+
+
+def get_fingerprint(files):
+    """Get fingerprint of input files from file names, sizes and mtimes."""
+    sha = hashlib.sha1()
+    for file in sorted(os.path.abspath(f) for f in files):
+        stat = os.stat(file)
+        sha.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+
+class TaskJournal:
+    """Journal of batch tasks as JSON lines file.
+
+    Every status change of a task is appended as one line with the task
+    key, the fingerprint of the input files, the output file names and
+    the status ("started", "done" or "failed"). The last line of a task
+    key is its current state. A task is completed if its last status is
+    "done", the input files did not change and all output files exist.
+
+    Parameters
+    ----------
+    journal_file: str
+        Journal file name. Created if it does not exist.
+    """
+
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self.tasks = self._read()
+        self._lock = threading.Lock()
+
+    def _read(self):
+        tasks = {}
+        if not os.path.isfile(self.journal_file):
+            return tasks
+        with open(self.journal_file) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line may be incomplete after an abort
+                    continue
+                tasks[entry["key"]] = entry
+        return tasks
+
+    def is_done(self, key, fingerprint):
+        """Check whether task `key` is completed for input `fingerprint`."""
+        entry = self.tasks.get(key)
+        if entry is None or entry["status"] != "done":
+            return False
+        if entry["fingerprint"] != fingerprint:
+            return False
+        return all(os.path.exists(output) for output in entry["outputs"])
+
+    def record(self, key, fingerprint, status, outputs=None, error=None):
+        """Append status of task `key` to journal."""
+        entry = {
+            "key": key,
+            "fingerprint": fingerprint,
+            "status": status,
+            "outputs": [str(output) for output in outputs or []],
+            "time": datetime.now(UTC).isoformat(),
+        }
+        if error is not None:
+            entry["error"] = str(error)
+        with self._lock:
+            dirname = os.path.dirname(self.journal_file)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with open(self.journal_file, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.tasks[key] = entry
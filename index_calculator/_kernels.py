@@ -0,0 +1,442 @@
+import operator
+from functools import reduce
+
+import numpy as np
+import xarray as xr
+from xclim.core.missing import missing_from_context
+from xclim.core.units import convert_units_to
+
+_operators = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def threshold_counts(da, conditions, freq="YS", context="hydro"):
+    """Count days meeting several threshold conditions in one pass.
+
+    All comparisons are stacked along a new dimension and reduced with
+    one single resample over the time axis. Periods with missing values
+    are masked as xclim does for its counting indicators.
+
+    Parameters
+    ----------
+    da: xr.DataArray
+        Daily input variable.
+    conditions: dict
+        Dictionary mapping output names to tuples of a logical operator
+        (">", ">=", "<", "<=") and a threshold quantity string,
+        e.g. ``{"FD": ("<", "0 degC"), "SU": (">", "25 degC")}``.
+    freq: str (default: "YS"), optional
+        Resampling frequency.
+    context: str (default: "hydro"), optional
+        Unit conversion context used for converting thresholds.
+
+    Returns
+    -------
+    xr.Dataset
+        Number of days meeting each condition.
+    """
+    names = list(conditions.keys())
+    compared = []
+    for op, thresh in conditions.values():
+        thresh = convert_units_to(thresh, da, context=context)
+        compared.append(_operators[op](da, thresh))
+    compared = xr.concat(compared, dim="condition")
+    compared = compared.assign_coords(condition=names)
+    counts = compared.resample(time=freq).sum(dim="time")
+    mask = missing_from_context(da, freq)
+    counts = counts.where(~mask)
+    counts = counts.to_dataset(dim="condition")
+    for name in names:
+        counts[name].attrs["units"] = "days"
+    return counts
+
+
+def compound_counts(das, thresholds, conditions, freq="YS", context="hydro"):
+    """Count days meeting several compound percentile conditions in one pass.
+
+    Every comparison of one variable with one day-of-year threshold is
+    evaluated once and shared by all conditions using it. All conditions
+    are stacked along a new dimension and reduced with one single resample
+    over the time axis. Periods with missing values in any input variable
+    are masked as xclim does for its multivariate counting indicators.
+
+    Parameters
+    ----------
+    das: dict
+        Dictionary mapping variable names to daily input variables,
+        e.g. ``{"tas": tas, "pr": pr}``.
+    thresholds: dict
+        Dictionary mapping variable names to dictionaries of day-of-year
+        thresholds, e.g. ``{"tas": {25: tas_25, 75: tas_75}}``.
+    conditions: dict
+        Dictionary mapping output names to dictionaries mapping variable
+        names to tuples of a logical operator (">", ">=", "<", "<=") and a
+        threshold key, e.g. ``{"CD": {"tas": ("<", 25), "pr": ("<", 25)}}``.
+    freq: str (default: "YS"), optional
+        Resampling frequency.
+    context: str (default: "hydro"), optional
+        Unit conversion context used for converting thresholds.
+
+    Returns
+    -------
+    xr.Dataset
+        Number of days meeting each compound condition.
+    """
+    from xclim.core.calendar import resample_doy
+
+    names = list(conditions.keys())
+    compared = {}
+    combined = []
+    for condition in conditions.values():
+        conds = []
+        for variable, (op, key) in condition.items():
+            if (variable, op, key) not in compared:
+                da = das[variable]
+                thresh = convert_units_to(
+                    thresholds[variable][key], da, context=context
+                )
+                cond = _operators[op](da, resample_doy(thresh, da))
+                compared[(variable, op, key)] = cond.drop_vars(
+                    [coord for coord in cond.coords if coord not in da.coords]
+                )
+            conds.append(compared[(variable, op, key)])
+        combined.append(reduce(operator.and_, conds))
+    combined = xr.concat(combined, dim="condition")
+    combined = combined.assign_coords(condition=names)
+    counts = combined.resample(time=freq).sum(dim="time")
+    mask = reduce(operator.or_, [missing_from_context(da, freq) for da in das.values()])
+    counts = counts.where(~mask)
+    counts = counts.to_dataset(dim="condition")
+    for name in names:
+        counts[name].attrs["units"] = "days"
+    return counts
+
+
+def _spell_statistics(cond, starts, ends, windows):
+    from ._jit import _run_length_statistics
+
+    shape = windows.shape + cond.shape[:-1] + starts.shape
+    cond = np.ascontiguousarray(cond.reshape(-1, cond.shape[-1]))
+    stats = _run_length_statistics(cond, starts, ends, windows)
+    return tuple(np.moveaxis(stat.reshape(shape), 0, -2) for stat in stats)
+
+
+def spell_statistics(cond, window=1, freq="YS"):
+    """Compute run-length statistics of spells in one pass per period.
+
+    Runs of True values of `cond` are split at the period boundaries
+    as xclim does with ``resample_before_rl=True``. Only runs of at least
+    `window` time steps are taken into account.
+
+    Parameters
+    ----------
+    cond: xr.DataArray
+        Boolean daily spell mask.
+    window: int or list (default: 1), optional
+        Minimum length of a spell. If list, the statistics of all
+        minimum lengths are computed in the same pass and indexed by a
+        new dimension "window".
+    freq: str (default: "YS"), optional
+        Resampling frequency.
+
+    Returns
+    -------
+    xr.Dataset
+        Maximum spell length ("max"), total number of days in spells
+        ("sum") and number of spells ("count") for each period.
+    """
+    windows = np.atleast_1d(window).astype(np.int64)
+    position = xr.DataArray(
+        np.arange(cond.time.size),
+        dims="time",
+        coords={"time": cond.time},
+    ).resample(time=freq)
+    starts = position.min().astype(np.int64).rename(time="period")
+    ends = (position.max() + 1).astype(np.int64).rename(time="period")
+    stats = xr.apply_ufunc(
+        _spell_statistics,
+        cond,
+        starts,
+        ends,
+        kwargs={"windows": windows},
+        input_core_dims=[["time"], ["period"], ["period"]],
+        output_core_dims=[["window", "period"]] * 3,
+        dask="parallelized",
+        output_dtypes=[np.float64, np.float64, np.float64],
+        dask_gufunc_kwargs={
+            "allow_rechunk": True,
+            "output_sizes": {"window": windows.size},
+        },
+    )
+    stats = xr.Dataset(dict(zip(["max", "sum", "count"], stats)))
+    stats = stats.rename(period="time").transpose(*cond.dims, "window")
+    if np.ndim(window) == 0:
+        return stats.squeeze("window", drop=True)
+    return stats.assign_coords(window=windows)
+
+
+def _doy_samples(time, window):
+    """Time step indices of the moving window samples of each day of year.
+
+    As in ``xclim.core.calendar.percentile_doy`` the samples of a day of
+    year are the `window` time steps centred on every time step of that
+    day of year. Samples outside of the time axis are skipped.
+    Rows are padded with -1.
+    """
+    doy = time.dt.dayofyear.values
+    doys = np.unique(doy)
+    offsets = np.arange(window) - window // 2
+    samples = []
+    for d in doys:
+        idx = (np.nonzero(doy == d)[0][:, None] + offsets).ravel()
+        samples.append(idx[(idx >= 0) & (idx < doy.size)])
+    size = max(len(idx) for idx in samples)
+    padded = np.full((doys.size, size), -1, dtype=np.int64)
+    for i, idx in enumerate(samples):
+        padded[i, : len(idx)] = idx
+    return padded, doys
+
+
+def _percentile_doy(arr, samples, quantiles, alpha, beta):
+    from ._jit import _select_quantiles
+
+    shape = arr.shape[:-1] + (samples.shape[0], quantiles.size)
+    arr = np.ascontiguousarray(arr.reshape(-1, arr.shape[-1]))
+    out = _select_quantiles(arr, samples, quantiles, alpha, beta)
+    return out.reshape(shape)
+
+
+def _apply_percentile_doy(da, samples, quantiles, alpha, beta):
+    """Apply the selection kernel to all spatial chunks of `da`."""
+    if da.chunks is not None:
+        da = da.chunk({"time": -1})
+    return xr.apply_ufunc(
+        _percentile_doy,
+        da,
+        input_core_dims=[["time"]],
+        output_core_dims=[["dayofyear", "percentiles"]],
+        kwargs={
+            "samples": samples,
+            "quantiles": quantiles,
+            "alpha": alpha,
+            "beta": beta,
+        },
+        dask="parallelized",
+        output_dtypes=[da.dtype],
+        dask_gufunc_kwargs={
+            "output_sizes": {
+                "dayofyear": samples.shape[0],
+                "percentiles": quantiles.size,
+            }
+        },
+    )
+
+
+def percentile_doy(
+    da, window=5, per=10.0, alpha=1.0 / 3.0, beta=1.0 / 3.0, doy_block=None
+):
+    """Compute day-of-year percentiles by selection instead of sorting.
+
+    Drop-in replacement of ``xclim.core.calendar.percentile_doy``.
+    The moving window samples are not stacked into one large array.
+    Instead, a numba kernel gathers the samples of one grid point and
+    day of year at a time and selects the requested order statistics
+    by partial sorting. The time axis is rechunked to one chunk, the
+    spatial chunks of `da` are kept and computed one by one.
+
+    Parameters
+    ----------
+    da: xr.DataArray
+        Daily input variable.
+    window: int (default: 5), optional
+        Number of time steps around each day of year.
+    per: float or list (default: 10.0), optional
+        Percentile(s) between 0 and 100.
+    alpha: float (default: 1/3), optional
+        Plotting position parameter.
+    beta: float (default: 1/3), optional
+        Plotting position parameter.
+    doy_block: int, optional
+        If set, stream through the days of year in blocks of `doy_block`
+        days. Each block reads only the time steps of its moving windows
+        from every year of `da` and is computed before the next block is
+        read. Apart from the percentiles themselves, peak memory is then
+        bounded by about ``(doy_block + window - 1) / 365`` of the whole
+        time series. The percentiles are identical to those without
+        blocks.
+
+    Returns
+    -------
+    xr.DataArray
+        Percentiles indexed by day of year. As in xclim, percentiles of
+        calendars with 366 days are interpolated from the days 1-365.
+        Computed if `doy_block` is set, lazy otherwise.
+    """
+    from xclim.core.calendar import adjust_doy_calendar, build_climatology_bounds
+
+    per = np.atleast_1d(per).tolist()
+    quantiles = np.array([p / 100.0 for p in sorted(per)])
+    samples, doys = _doy_samples(da.time, window)
+    if doy_block is None:
+        p = _apply_percentile_doy(da, samples, quantiles, alpha, beta)
+    else:
+        blocks = []
+        for start in range(0, doys.size, doy_block):
+            block = samples[start : start + doy_block]
+            steps = np.unique(block[block >= 0])
+            block = np.where(block >= 0, np.searchsorted(steps, block), -1)
+            blocks.append(
+                _apply_percentile_doy(
+                    da.isel(time=steps), block, quantiles, alpha, beta
+                ).compute()
+            )
+        p = xr.concat(blocks, dim="dayofyear")
+        if da.chunks is not None and doys.max() == 366:
+            # dask casts to the declared output dtype before interpolating
+            p = p.astype(da.dtype)
+    p = p.assign_coords(dayofyear=doys, percentiles=sorted(per))
+    if per != sorted(per):
+        p = p.sel(percentiles=per)
+    if doys.max() == 366:
+        p = adjust_doy_calendar(p.sel(dayofyear=(p.dayofyear < 366)), da)
+    p.attrs.update(da.attrs.copy())
+    p.attrs["climatology_bounds"] = build_climatology_bounds(da)
+    p.attrs["window"] = window
+    p.attrs["alpha"] = alpha
+    p.attrs["beta"] = beta
+    return p.rename("per")
+
+
+def bootstrap_freq(freq):
+    """Get yearly bootstrap frequency anchored as the index frequency `freq`."""
+    from xclim.core.calendar import parse_offset
+
+    _, base, start_anchor, anchor = parse_offset(freq)
+    bfreq = "YS" if start_anchor else "YE"
+    if base in ["A", "Y", "Q"] and anchor is not None:
+        bfreq = f"{bfreq}-{anchor}"
+    return bfreq
+
+
+def bootstrap_sources(time, freq):
+    """Source time steps of the bootstrapped base periods of every year.
+
+    The base period is altered as in xclim's bootstrapping: the time steps
+    of one year are replaced by those of every other year of the base
+    period, one at a time. Instead of altered data the time step indices
+    of the replacements are returned.
+
+    Parameters
+    ----------
+    time: xr.DataArray
+        Time axis of the base period.
+    freq: str
+        Bootstrap frequency, e.g. "YS".
+
+    Returns
+    -------
+    dict
+        Tuples of the first time step of the replaced year and the time
+        step indices of its replacements (replicate, time step) for each
+        year label. Missing time steps are -1.
+    """
+    from xclim.core.bootstrapping import build_bootstrap_year_da
+
+    position = xr.DataArray(
+        np.arange(time.size, dtype=float),
+        dims="time",
+        coords={"time": time},
+    )
+    groups = position.resample(time=freq).groups
+    sources = {}
+    for label, group in groups.items():
+        bloc = np.arange(time.size)[group]
+        source = build_bootstrap_year_da(position, groups, label)
+        source = source.isel(time=bloc).values
+        source = np.where(np.isnan(source), -1, source).astype(np.int64)
+        sources[label] = (bloc[0], source)
+    return sources
+
+
+def _bootstrap_percentile_doy(arr, samples, start, source, quantiles, alpha, beta):
+    from ._jit import _bootstrap_quantiles
+
+    shape = arr.shape[:-1] + (source.shape[0], samples.shape[0], quantiles.size)
+    arr = np.ascontiguousarray(arr.reshape(-1, arr.shape[-1]))
+    out = _bootstrap_quantiles(arr, samples, start, source, quantiles, alpha, beta)
+    return out.reshape(shape)
+
+
+def bootstrap_percentile_doy(
+    da, start, source, window=5, per=10.0, alpha=1.0 / 3.0, beta=1.0 / 3.0
+):
+    """Compute day-of-year percentiles of bootstrapped base periods.
+
+    Equivalent to ``xclim.core.calendar.percentile_doy`` applied to every
+    altered base period of one year as built by xclim's bootstrapping,
+    but without building the altered base periods.
+
+    Parameters
+    ----------
+    da: xr.DataArray
+        Daily input variable of the base period.
+    start: int
+        First time step of the replaced year.
+    source: np.ndarray
+        Time step indices of the replacements (replicate, time step)
+        of the replaced year (see :func:`bootstrap_sources`).
+    window: int (default: 5), optional
+        Number of time steps around each day of year.
+    per: float or list (default: 10.0), optional
+        Percentile(s) between 0 and 100.
+    alpha: float (default: 1/3), optional
+        Plotting position parameter.
+    beta: float (default: 1/3), optional
+        Plotting position parameter.
+
+    Returns
+    -------
+    xr.DataArray
+        Percentiles indexed by replicate ("_bootstrap") and day of year.
+    """
+    from xclim.core.bootstrapping import BOOTSTRAP_DIM
+    from xclim.core.calendar import adjust_doy_calendar
+
+    per = np.atleast_1d(per).tolist()
+    samples, doys = _doy_samples(da.time, window)
+    if da.chunks is not None:
+        da = da.chunk({"time": -1})
+    p = xr.apply_ufunc(
+        _bootstrap_percentile_doy,
+        da,
+        input_core_dims=[["time"]],
+        output_core_dims=[[BOOTSTRAP_DIM, "dayofyear", "percentiles"]],
+        kwargs={
+            "samples": samples,
+            "start": int(start),
+            "source": source,
+            "quantiles": np.array([p / 100.0 for p in sorted(per)]),
+            "alpha": alpha,
+            "beta": beta,
+        },
+        dask="parallelized",
+        output_dtypes=[np.float64],
+        dask_gufunc_kwargs={
+            "output_sizes": {
+                BOOTSTRAP_DIM: source.shape[0],
+                "dayofyear": doys.size,
+                "percentiles": len(per),
+            }
+        },
+    )
+    p = p.assign_coords({BOOTSTRAP_DIM: np.arange(source.shape[0]), "dayofyear": doys})
+    p = p.assign_coords(percentiles=sorted(per))
+    if per != sorted(per):
+        p = p.sel(percentiles=per)
+    if doys.max() == 366:
+        p = adjust_doy_calendar(p.sel(dayofyear=(p.dayofyear < 366)), da)
+    return p.rename("per")
@@ -0,0 +1,254 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from pyhomogenize import open_xrdataset
+
+from ._batch import BatchCalculator as batch
+from ._consts import _journal_file
+from ._journal import TaskJournal, get_fingerprint, get_task_key
+from ._registry import registry
+
+
+def read_manifest(manifest_file):
+    """Read YAML manifest file.
+
+    Parameters
+    ----------
+    manifest_file: str
+        Manifest file name.
+
+    Returns
+    -------
+    dict
+        Manifest content.
+    """
+    with open(manifest_file) as f:
+        manifest = yaml.safe_load(f)
+    if not isinstance(manifest, dict):
+        raise ValueError(f"Manifest {manifest_file} is not a mapping.")
+    return manifest
+
+
+def _to_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _dataset_key(input_file):
+    """Get dataset key of `input_file`.
+
+    File names following the CORDEX/CMIP DRS differ only in the leading
+    variable name and the trailing time range. Files with the same key
+    are opened as one dataset.
+    """
+    dirname, basename = os.path.split(input_file)
+    stem = os.path.splitext(basename)[0]
+    components = stem.split("_")
+    if len(components) > 2:
+        components = components[1:-1]
+    return (dirname, "_".join(components))
+
+
+def expand_inputs(inputs):
+    """Expand input globs to datasets.
+
+    Parameters
+    ----------
+    inputs: str or list
+        Glob patterns of input files.
+
+    Returns
+    -------
+    list
+        Tuples of input file names each describing one dataset.
+    """
+    datasets = {}
+    for pattern in _to_list(inputs):
+        input_files = sorted(glob.glob(os.path.expanduser(pattern)))
+        if not input_files:
+            raise FileNotFoundError(f"No input files found for {pattern}.")
+        for input_file in input_files:
+            key = _dataset_key(input_file)
+            files = datasets.setdefault(key, [])
+            if input_file not in files:
+                files.append(input_file)
+    return [tuple(files) for files in datasets.values()]
+
+
+def expand_manifest(manifest):
+    """Expand manifest to a list of tasks.
+
+    Every task calculates one climate index for one dataset,
+    one output frequency and one project.
+
+    Parameters
+    ----------
+    manifest: dict
+        Manifest content (see :func:`run_manifest`).
+
+    Returns
+    -------
+    list
+        Tasks as dictionaries with keys "files", "index", "freq"
+        and "project".
+    """
+    indices = _to_list(manifest.get("indices"))
+    if not indices:
+        raise ValueError("Please select a list of climate indicator names.")
+    registry.validate(indices)
+    frequencies = _to_list(manifest.get("frequencies", "year"))
+    projects = _to_list(manifest.get("projects", "N/A"))
+    tasks = []
+    for files in expand_inputs(manifest.get("inputs")):
+        for project in projects:
+            for freq in frequencies:
+                for index in indices:
+                    tasks.append(
+                        {
+                            "files": files,
+                            "index": index,
+                            "freq": freq,
+                            "project": project,
+                        }
+                    )
+    return tasks
+
+
+def group_tasks(tasks):
+    """Group tasks by input files, project and frequency.
+
+    Returns
+    -------
+    dict
+        For each tuple of input files the climate index names
+        per (project, frequency).
+    """
+    groups = {}
+    for task in tasks:
+        group = groups.setdefault(task["files"], {})
+        indices = group.setdefault((task["project"], task["freq"]), [])
+        if task["index"] not in indices:
+            indices.append(task["index"])
+    return groups
+
+
+def _run_group(files, group, journal=None, **kwargs):
+    """Open `files` once and calculate all climate indices of `group`.
+
+    If `journal` is set, completed tasks are skipped and the status of
+    all other tasks is recorded.
+    """
+    ds = None
+    fingerprint = None
+    if journal is not None:
+        fingerprint = get_fingerprint(files)
+    for (project, freq), indices in group.items():
+        keys = {index: get_task_key(files, index, freq, project) for index in indices}
+        if journal is not None:
+            keys = {
+                index: key
+                for index, key in keys.items()
+                if not journal.is_done(key, fingerprint)
+            }
+            for key in keys.values():
+                journal.record(key, fingerprint, "started")
+        if not keys:
+            continue
+        if ds is None:
+            ds = open_xrdataset(list(files))
+        try:
+            idx = batch(
+                ds=ds,
+                indices=list(keys.keys()),
+                freq=freq,
+                project=project,
+                write=True,
+                **kwargs,
+            )
+        except Exception as e:
+            if journal is not None:
+                for key in keys.values():
+                    journal.record(key, fingerprint, "failed", error=e)
+            raise
+        if journal is not None:
+            for index, key in keys.items():
+                journal.record(key, fingerprint, "done", outputs=idx.outputs[index])
+
+
+def run_manifest(manifest, workers=None):
+    """Calculate all climate indices of a manifest.
+
+    The manifest is expanded to one task per dataset, climate index,
+    output frequency and project. Tasks sharing the same input files
+    are grouped so that every dataset is opened once and every group of
+    climate indices is evaluated with :func:`~index_calculator.batch`.
+    The groups are executed by a pool of `workers` threads.
+
+    Parameters
+    ----------
+    manifest: dict or str
+        Manifest content or YAML manifest file name with keys:
+
+        inputs: str or list
+            Glob patterns of input files. Matching files that differ only
+            in variable name and time range are opened as one dataset.
+        indices: str or list
+            Climate indicator names.
+        frequencies: str or list (default: "year"), optional
+            Output frequencies.
+        projects: str or list (default: "N/A"), optional
+            Project names.
+        workers: int (default: 1), optional
+            Number of datasets processed concurrently.
+        journal: str or bool, optional
+            Task journal file name (see :class:`TaskJournal`).
+            A restarted run skips all tasks completed before.
+            Default is "index_calculator_journal.jsonl" in "output_dir".
+            If False, no journal is written.
+        dask: dict, optional
+            Dask scheduler set up by the command line interface
+            (see :func:`dask_scheduler`).
+        options: dict, optional
+            Further keyword arguments passed to
+            :func:`~index_calculator.batch`, e.g. "output_dir",
+            "institution", "institution_id", "contact" or processing
+            options like "bootstrap" or "percentile_engine".
+    workers: int, optional
+        Overwrite the number of workers of `manifest`.
+
+    Returns
+    -------
+    dict
+        Exceptions of failed groups per tuple of input files.
+        Empty if all groups succeeded.
+    """
+    if isinstance(manifest, str):
+        manifest = read_manifest(manifest)
+    if workers is None:
+        workers = manifest.get("workers", 1)
+    options = manifest.get("options") or {}
+    groups = group_tasks(expand_manifest(manifest))
+    journal = manifest.get("journal", True)
+    if journal is True:
+        journal = os.path.join(options.get("output_dir", "."), _journal_file)
+    if journal:
+        journal = TaskJournal(journal)
+    else:
+        journal = None
+
+    def run_group(item):
+        files, group = item
+        try:
+            _run_group(files, group, journal=journal, **options)
+        except Exception as e:
+            return files, e
+        return files, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_group, groups.items()))
+    return {files: e for files, e in results if e is not None}
@@ -0,0 +1,191 @@
+import json
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+import pandas as pd
+
+
+def _max_rss():
+    """Get peak resident set size of the process lifetime in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def _high_water_mark():
+    """Get peak resident set size since the last reset in bytes.
+
+    Only available on Linux. Returns None otherwise.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return
+
+
+def _reset_high_water_mark():
+    """Reset peak resident set size to the current resident set size.
+
+    Only possible on Linux. Returns False otherwise.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return _high_water_mark() is not None
+
+
+class _StagePeaks:
+    """Peak resident set size of concurrent and nested stages.
+
+    The high-water mark of the process is reset whenever a stage starts.
+    Before that, it is added to the peaks of all running stages. Thus,
+    every stage gets the peak of its own lifetime only. If the
+    high-water mark can not be reset, the lifetime peak of the process is
+    used if it increased during the stage.
+    """
+
+    def __init__(self):
+        self._peaks = {}
+        self._lock = threading.Lock()
+
+    def _update(self):
+        peak = _high_water_mark()
+        for token, (resettable, value) in self._peaks.items():
+            if resettable:
+                self._peaks[token] = (resettable, max(value, peak))
+
+    def start(self, token):
+        with self._lock:
+            self._update()
+            if _reset_high_water_mark():
+                self._peaks[token] = (True, _high_water_mark())
+            else:
+                self._peaks[token] = (False, _max_rss())
+
+    def stop(self, token):
+        with self._lock:
+            self._update()
+            resettable, value = self._peaks.pop(token)
+        if resettable:
+            return value
+        peak = _max_rss()
+        if peak > value:
+            return peak
+
+
+_stage_peaks = _StagePeaks()
+
+
+def _io_counters():
+    """Get bytes read and written by the process so far.
+
+    Only available on Linux. Returns None otherwise.
+    """
+    try:
+        with open("/proc/self/io") as f:
+            counters = dict(line.split(":") for line in f)
+    except OSError:
+        return
+    return int(counters["rchar"]), int(counters["wchar"])
+
+
+def get_task_count(obj):
+    """Get number of dask tasks of `obj`.
+
+    Parameters
+    ----------
+    obj: xr.Dataset, xr.DataArray or list
+        Dask collection(s).
+
+    Returns
+    -------
+    int
+        Number of tasks. 0 if `obj` is not backed by dask.
+    """
+    if isinstance(obj, list):
+        return sum(get_task_count(o) for o in obj)
+    graph = obj.__dask_graph__()
+    if graph is None:
+        return 0
+    return len(graph)
+
+
+class Metrics:
+    """Timing and memory metrics of the processing stages.
+
+    Every stage records one dictionary with the keys "index", "stage",
+    "start", "wall_time" (s), "stage_peak_rss" (bytes), "dask_tasks",
+    "bytes_read" and "bytes_written". The stage peak RSS is the peak
+    resident set size of the process while the stage was running,
+    including stages and threads running at the same time. Outside of
+    Linux it is only known if it exceeded the peak of all earlier stages,
+    otherwise it is None. Bytes read and written are counted on Linux
+    only and include every thread of the process.
+
+    Example
+    -------
+    Get metrics of a climate index calculation::
+
+        from index_calculator import index_calculator
+
+        idx = index_calculator(ds=ds, index="TG", write=True)
+        idx.metrics.to_dataframe()
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, stage, index=None):
+        """Measure stage `stage` of climate index `index`.
+
+        Yields the record of the stage so that the caller can add
+        stage-specific values like "dask_tasks".
+        """
+        record = {
+            "index": index,
+            "stage": stage,
+            "start": datetime.now(UTC).isoformat(),
+            "dask_tasks": None,
+        }
+        io_start = _io_counters()
+        _stage_peaks.start(id(record))
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - start
+            record["stage_peak_rss"] = _stage_peaks.stop(id(record))
+        io_end = _io_counters()
+        if io_start is None or io_end is None:
+            record["bytes_read"] = record["bytes_written"] = None
+        else:
+            record["bytes_read"] = io_end[0] - io_start[0]
+            record["bytes_written"] = io_end[1] - io_start[1]
+        with self._lock:
+            self.records.append(record)
+
+    def to_dataframe(self):
+        """Convert records to pandas.DataFrame."""
+        return pd.DataFrame(self.records)
+
+    def to_jsonl(self, metrics_file):
+        """Append records as JSON lines to `metrics_file`."""
+        from . import __version__
+
+        with open(metrics_file, "a") as f:
+            f.writelines(
+                json.dumps({**record, "version": __version__}) + "\n"
+                for record in self.records
+            )
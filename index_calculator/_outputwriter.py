@@ -1,16 +1,29 @@
 import os
+import shutil
 import warnings
 from pathlib import Path
 
+import dask
+import numpy as np
+import xarray as xr
 from pyhomogenize import save_xrdataset
+from pyhomogenize._consts import freqs as _freq
 
+from ._consts import _encoding_profiles, _horizontal_dims
 from ._tables import pjson
-from ._utils import object_attrs_to_self
+from ._utils import (
+    get_time_range_as_str,
+    normalize_pandas_freq,
+    object_attrs_to_self,
+)
 
 
 class OutputWriter:
     """Class for writing xarray.Dataset to disk.
     Get default project-specific output name.
+    Every file is written to a temporary ``<name>.tmp`` file first and
+    renamed when complete, so that no half-written files are left.
+    The names of the written files are stored in `output_files`.
 
     Parameters
     ----------
@@ -23,6 +36,35 @@ class OutputWriter:
         Set output directory
     drs: bool (default: True), optional
         If True create project-specific directory structure
+    output_format: {"netcdf", "zarr"} (default: "netcdf"), optional
+        Output file format. If "zarr", each dataset is written to a Zarr
+        store and the chunks are written in parallel by dask.
+    encoding_profile: str or dict, optional
+        Compression and storage profile of the climate index variable.
+        Select one of "archive" (strong compression and bit-rounding
+        to 12 significant bits), "fast-read-timeseries" (light compression,
+        whole time series per chunk) or "fast-read-maps" (light
+        compression, one time step per chunk). A dict may contain the
+        netCDF4 encoding keys "zlib", "complevel", "shuffle",
+        "least_significant_digit", "quantize_mode", "significant_digits"
+        and "chunks". Chunks are given as a dict with the keys "time"
+        and "horizontal" and -1 selects the whole dimension.
+        For Zarr output only the chunks are used.
+        If None (default) only the data type is set.
+    append: bool (default: False), optional
+        If True, existing output files of the climate index in the output
+        directory are extended with the time steps they do not contain
+        yet. Periods which were incomplete in the input of the existing
+        files (see attribute ``ci_timerange_source``) are recomputed and
+        overwritten. Only those and the new time steps are computed and
+        written along the unlimited time dimension. Time steps of new
+        split periods are written to new files. Use together with
+        ``percentile_cache`` to reuse the stored percentile reference.
+    num_workers: int, optional
+        Maximum number of threads used to write the output files.
+        All files are written together so that the shared upstream
+        graph is computed only once. If None (default) use dask's
+        default number of workers.
 
     Example
     -------
@@ -64,6 +106,10 @@ class OutputWriter:
         output_name=True,
         output_dir=".",
         drs=True,
+        output_format="netcdf",
+        encoding_profile=None,
+        append=False,
+        num_workers=None,
         **kwargs,
     ):
         if postproc_obj is None:
@@ -80,11 +126,32 @@ class OutputWriter:
             output_dir = os.path.join(
                 output_dir, self._directory_structure(postprocs[0])
             )
+        if output_format not in ["netcdf", "zarr"]:
+            raise ValueError(
+                f"Output format {output_format} not supported. "
+                "Please select one of 'netcdf' or 'zarr'."
+            )
         os.makedirs(output_dir, exist_ok=True)
         self.output_name = output_name
-        ds_dict = {}
+        self.output_format = output_format
+        self.encoding_profile = self._get_encoding_profile(encoding_profile)
+        existing = {}
+        if append is True:
+            existing = self._get_existing_outputs(output_dir)
+            self._keys = []
+            for postproc in postprocs:
+                self._keys += self._time_keys(postproc.time)
+        writes = {}
+        replaced = {}
         for postproc in postprocs:
             ds_ = postproc.copy()
+            appendname = None
+            if append is True:
+                ds_, appendname, start = self._select_missing_time_steps(
+                    ds_, existing
+                )
+                if ds_ is None:
+                    continue
             if self.output_name is True:
                 output_name = self._outname(ds_)
             else:
@@ -93,7 +160,28 @@ class OutputWriter:
                 print("Could not write output.")
                 continue
             outputname = Path(os.path.join(output_dir, output_name)).resolve()
-            ds_dict[output_name] = self._to_netcdf(ds_, outputname)
+            if self.output_format == "zarr":
+                outputname = outputname.with_suffix(".zarr")
+            tmpname = self._tmpname(outputname)
+            if appendname is not None:
+                replaced[outputname] = appendname
+                if self._is_appendable(ds_, appendname):
+                    writes[outputname] = dask.delayed(self._append)(
+                        ds_, appendname, tmpname, start
+                    )
+                    continue
+                ds_ = self._prepend_time_steps(ds_, appendname, start)
+            if self.output_format == "zarr":
+                writes[outputname] = self._to_zarr(ds_, tmpname)
+            else:
+                writes[outputname] = self._to_netcdf(ds_, tmpname)
+        dask.compute(*writes.values(), num_workers=num_workers)
+        for outputname in writes.keys():
+            self._replace(self._tmpname(outputname), outputname)
+            if replaced.get(outputname, outputname) != outputname:
+                self._remove(replaced[outputname])
+            print(f"File written: {outputname}")
+        self.output_files = list(writes.keys())
 
     def _parse_components_to_format(self, ds, out_components, out_format):
         def test_ocomp(ocomp):
@@ -133,17 +221,251 @@ class OutputWriter:
             return
         return self._parse_components_to_format(ds, output_comps, output_fmt)
 
+    def _get_existing_outputs(self, output_dir):
+        """Get time steps of existing output files of the climate index."""
+        if self.output_format == "zarr":
+            files = Path(output_dir).glob("*.zarr")
+        else:
+            files = Path(output_dir).glob("*.nc")
+        existing = {}
+        for file in files:
+            with xr.open_dataset(file.resolve()) as ds:
+                if self.CIname not in ds.data_vars or "time" not in ds.dims:
+                    continue
+                existing[file.resolve()] = (
+                    self._time_keys(ds.time),
+                    ds.attrs,
+                )
+        return existing
+
+    def _time_keys(self, time):
+        return time.dt.strftime("%Y%m%d%H%M%S").values.tolist()
+
+    def _first_incomplete_period(self, end):
+        """Get time key of first period with input time steps after `end`.
+
+        `end` is the end of the input time range of an existing output
+        file formatted like ``ci_timerange_source``. Returns None if no
+        input time steps follow `end`.
+        """
+        time = self.preproc.time
+        freq = normalize_pandas_freq(_freq[self.freq])
+        newer = (time.dt.strftime(self.afmt) > end).resample(time=freq).any()
+        if len(newer) != len(self._keys):
+            # periods do not match the output time steps
+            return self._keys[0] if newer.any() else None
+        for key, new in zip(self._keys, newer.values):
+            if new:
+                return key
+
+    def _select_missing_time_steps(self, ds, existing):
+        """Select time steps of `ds` not completely contained in `existing`.
+
+        Returns the dataset restricted to the time steps to be written,
+        the name of the existing output file of the same split period to
+        be extended, if any, and the index of the first time step to be
+        overwritten in that file. All periods from the first period which
+        was incomplete in the input of the existing file onward are
+        recomputed. If `ds` is complete on disk, return None.
+        """
+        keys = self._time_keys(ds.time)
+        trange = "ci_timerange_index"
+        for name, (existing_keys, attrs) in existing.items():
+            if attrs.get("ci_frequency") != ds.attrs.get("ci_frequency"):
+                continue
+            if not set(keys) & set(existing_keys):
+                continue
+            end = attrs["ci_timerange_source"].split("-")[-1]
+            first = self._first_incomplete_period(end)
+            if first is None or first > keys[-1]:
+                return None, None, None
+            ds = ds.isel(time=[key >= first for key in keys])
+            start = sum(key < first for key in existing_keys)
+            left = attrs[trange].split("-")[0]
+            right = get_time_range_as_str(ds.time.values, self.fmt)[1]
+            ds.attrs[trange] = f"{left}-{right}"
+            return ds, name, start
+        return ds, None, None
+
+    def _tmpname(self, name):
+        """Get temporary file name written before renaming to `name`."""
+        return name.with_name(f"{name.name}.tmp")
+
+    def _remove(self, name):
+        if os.path.isdir(name):
+            shutil.rmtree(name)
+        elif os.path.exists(name):
+            os.remove(name)
+
+    def _replace(self, src, dst):
+        """Rename `src` to `dst` so that `dst` is never half-written."""
+        if os.path.isdir(dst):
+            shutil.rmtree(dst)
+        os.replace(src, dst)
+
+    def _is_appendable(self, ds, name):
+        """Check whether time steps of `ds` can be written to `name`.
+
+        This is the case if all variables of `ds` without time dimension
+        equal those of the existing output `name`.
+        """
+        with xr.open_dataset(name) as existing:
+            for var_name, var in ds.variables.items():
+                if "time" in var.dims:
+                    continue
+                if var_name not in existing.variables:
+                    return False
+                if not existing[var_name].variable.equals(var):
+                    return False
+        return True
+
+    def _prepend_time_steps(self, ds, name, start):
+        """Prepend time steps of existing output `name` before `start`."""
+        use_cftime = ds.time.dtype == object
+        existing = xr.open_dataset(
+            name,
+            chunks={},
+            decode_times=xr.coders.CFDatetimeCoder(use_cftime=use_cftime),
+        )
+        time_vars = [v for v in ds.variables if "time" in ds[v].dims]
+        time_ds = xr.concat(
+            [existing[time_vars].isel(time=slice(None, start)), ds[time_vars]],
+            dim="time",
+        )
+        return xr.merge([ds.drop_dims("time"), time_ds], combine_attrs="override")
+
+    def _append(self, ds, name, tmpname, start):
+        """Write time steps of `ds` to copy of existing output `name`.
+
+        The time steps are written from index `start` onward, i.e. time
+        steps of `name` from `start` onward are overwritten.
+        """
+        self._remove(tmpname)
+        if self.output_format == "zarr":
+            shutil.copytree(name, tmpname)
+            self._append_zarr(ds, tmpname, start)
+            self._set_zarr_attrs(tmpname, ds.attrs)
+        else:
+            shutil.copyfile(name, tmpname)
+            self._append_netcdf(ds, tmpname, start)
+
+    def _append_zarr(self, ds, name, start):
+        """Write time steps to Zarr store from index `start` onward."""
+        with xr.open_zarr(name) as existing:
+            size = existing.sizes["time"]
+        overlap = ds.isel(time=slice(None, size - start))
+        if overlap.sizes["time"]:
+            overlap = overlap.drop_vars(
+                [v for v in ds.variables if "time" not in ds[v].dims]
+            )
+            overlap.to_zarr(name, region={"time": slice(start, size)})
+        rest = ds.isel(time=slice(size - start, None))
+        if rest.sizes["time"]:
+            rest.to_zarr(name, append_dim="time")
+
+    def _set_zarr_attrs(self, name, attrs):
+        import zarr
+
+        group = zarr.open_group(name, mode="a")
+        group.attrs.update(attrs)
+        zarr.consolidate_metadata(name)
+
+    def _append_netcdf(self, ds, name, start):
+        """Write time steps along unlimited time dimension of netCDF file.
+
+        The time steps are written from index `start` onward.
+        """
+        import netCDF4
+
+        with netCDF4.Dataset(name, mode="a") as nc:
+            units = nc.variables["time"].units
+            calendar = getattr(nc.variables["time"], "calendar", "standard")
+            for var_name, var in nc.variables.items():
+                if var.dimensions[:1] != ("time",) or var_name not in ds.variables:
+                    continue
+                values = ds[var_name].transpose(*var.dimensions).values
+                if var_name == "time" or values.dtype.kind in ["M", "O"]:
+                    values = xr.coding.times.encode_cf_datetime(
+                        values,
+                        units=getattr(var, "units", units),
+                        calendar=getattr(var, "calendar", calendar),
+                    )[0]
+                else:
+                    values = np.ma.masked_invalid(values)
+                var[start : start + ds.sizes["time"]] = values
+            nc.setncatts(ds.attrs)
+
+    def _get_encoding_profile(self, encoding_profile):
+        if encoding_profile is None:
+            return {}
+        if isinstance(encoding_profile, dict):
+            return encoding_profile
+        if encoding_profile not in _encoding_profiles.keys():
+            raise ValueError(
+                f"Encoding profile {encoding_profile} not known. "
+                f"Please select one of {list(_encoding_profiles.keys())}."
+            )
+        return _encoding_profiles[encoding_profile]
+
+    def _get_chunks(self, ds):
+        """Get on-disk chunk shape of climate index variable."""
+        chunks = self.encoding_profile.get("chunks")
+        if not chunks:
+            return
+        chunksizes = []
+        for dim in ds[self.CIname].dims:
+            size = ds.sizes[dim]
+            if dim == "time":
+                chunk = chunks.get("time", -1)
+            elif dim in _horizontal_dims:
+                chunk = chunks.get("horizontal", -1)
+            else:
+                chunk = -1
+            if chunk == -1:
+                chunk = size
+            chunksizes.append(min(size, chunk))
+        return tuple(chunksizes)
+
     def _to_netcdf(self, ds, name):
-        """Write xarray.Dataset to netCDF file on disk."""
-        ds = save_xrdataset(
+        """Create delayed write of xarray.Dataset to netCDF file on disk."""
+        encoding = {"dtype": "float32"}
+        encoding.update(
+            {k: v for k, v in self.encoding_profile.items() if k != "chunks"}
+        )
+        encoding_dict = {"encoding": {self.CIname: encoding}}
+        chunksizes = self._get_chunks(ds)
+        if chunksizes:
+            encoding["chunksizes"] = chunksizes
+            encoding_dict["chunk_dict"] = None
+        return save_xrdataset(
             ds,
             name=name,
-            encoding_dict={
-                "encoding": {
-                    self.CIname: {"dtype": "float32"},
-                }
-            },
+            encoding_dict=encoding_dict,
             unlimited_dims={self.unlimited_dims: True},
+            compute=False,
+        )
+
+    def _to_zarr(self, ds, name):
+        """Create delayed write of xarray.Dataset to Zarr store on disk."""
+        chunks = {}
+        for dim, sizes in ds[self.CIname].chunksizes.items():
+            if len(set(sizes[:-1])) > 1 or sizes[-1] > sizes[0]:
+                chunks[dim] = max(sizes)
+        encoding = {
+            "dtype": "float32",
+            "_FillValue": 1e20,
+            "missing_value": 1e20,
+        }
+        chunksizes = self._get_chunks(ds)
+        if chunksizes:
+            chunks.update(dict(zip(ds[self.CIname].dims, chunksizes)))
+            encoding["chunks"] = chunksizes
+        if chunks:
+            ds[self.CIname] = ds[self.CIname].chunk(chunks)
+        return ds.to_zarr(
+            name,
+            mode="w",
+            encoding={self.CIname: encoding},
+            consolidated=True,
+            compute=False,
         )
-        print(f"File written: {name}")
-        return ds
@@ -117,6 +117,9 @@ class PostProcessing:
             output[self.CIname].attrs[attr_name] = attr_value
         associated_files = []
         for var_name in self.var_name:
+            if var_name not in self.ds.data_vars:
+                # derived while pre-processing
+                continue
             if "associated_files" not in self.ds[var_name].attrs.keys():
                 continue
             assoc_files = self.ds[var_name].attrs["associated_files"]
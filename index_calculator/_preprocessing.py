@@ -1,3 +1,4 @@
+import pandas as pd
 import pyhomogenize as pyh
 import xarray as xr
 from pyhomogenize._consts import fmt as _fmt
@@ -40,6 +41,11 @@ class PreProcessing:
     check_time_axis: bool, optional
         If True (default) check the time axis on duplicated, redundant
         and/or missing time steps.
+    derive_variables: bool (default: False), optional
+        If True derive missing variables while converting `ds` to `ifreq`.
+        For example, daily `tasmax`, `tasmin` and `tas` are derived
+        from sub-daily `tas` in one reduction pass.
+        The derivations are listed in `convert_to_frequency.json`.
 
     Example
     -------
@@ -67,6 +73,7 @@ class PreProcessing:
         time_range=None,
         crop_time_axis=True,
         check_time_axis=True,
+        derive_variables=False,
         **kwargs,
     ):
         if ds is None:
@@ -85,6 +92,7 @@ class PreProcessing:
         self.time_range = time_range
         self.crop_time_axis = crop_time_axis
         self.check_time_axis = check_time_axis
+        self.derive_variables = derive_variables
         kwargs_to_self(kwargs, self)
         self.preproc = self._preprocessing()
 
@@ -110,16 +118,29 @@ class PreProcessing:
         conv = fjson[self.ifreq]
         if conv["freq"] == xr.infer_freq(ds.time):
             return ds
+        steps = self._get_steps_per_period(ds.time, conv["freq"])
+        derive = {}
+        if self.derive_variables:
+            derive = conv.get("derive", {})
         data_vars = {}
         for dvar in ds.data_vars:
             if dvar in conv["var"].keys():
-                data_vars[dvar] = getattr(
-                    ds[dvar].resample(time=conv["freq"]),
-                    conv["var"][dvar],
-                )(dim="time")
-                data_vars[dvar].attrs["cell_methods"] = "time: {}".format(
-                    conv["var"][dvar]
-                )
+                targets = {dvar: conv["var"][dvar]}
+                for target, method in derive.get(dvar, {}).items():
+                    if target not in ds.data_vars:
+                        targets[target] = method
+                methods = list(dict.fromkeys(targets.values()))
+                if steps is None:
+                    reduced = self._reduce_resample(ds[dvar], conv["freq"], methods)
+                else:
+                    reduced = self._reduce_regular(
+                        ds[dvar], conv["freq"], steps, methods
+                    )
+                for target, method in targets.items():
+                    data_vars[target] = reduced[method].copy()
+                    if target != dvar:
+                        data_vars[target].attrs.pop("long_name", None)
+                    data_vars[target].attrs["cell_methods"] = f"time: {method}"
                 coords = data_vars[dvar].coords
         return xr.Dataset(
             data_vars=data_vars,
@@ -127,6 +148,57 @@ class PreProcessing:
             attrs=ds.attrs,
         )
 
+    def _get_steps_per_period(self, time, freq):
+        """Get number of time steps per period of regular time axis.
+
+        Return None if `time` is irregular, if the first time step is not
+        the first time step of a period or if `time` does not cover whole
+        periods. Then, the time axis has to be resampled.
+        """
+        if time.size < 2:
+            return
+        try:
+            period = pd.to_timedelta(f"1{freq}")
+        except ValueError:
+            return
+        index = time.to_index()
+        steps = (index[1:] - index[:-1]).unique()
+        if len(steps) != 1 or period % steps[0]:
+            return
+        n = period // steps[0]
+        if n < 2 or time.size % n:
+            return
+        offset = time[0] - time[0].dt.floor(freq)
+        if offset.values >= steps[0].to_timedelta64():
+            return
+        return n
+
+    def _reduce_resample(self, da, freq, methods):
+        """Reduce `da` to `freq` with all `methods` using resample."""
+        resampled = da.resample(time=freq)
+        return {method: getattr(resampled, method)(dim="time") for method in methods}
+
+    def _reduce_regular(self, da, freq, n, methods):
+        """Reduce `da` to `freq` with all `methods` over blocks of `n` steps.
+
+        The time axis is reshaped to (period, step) and reduced along
+        `step`. Unlike resample, this needs no per-period groups, so all
+        reductions share one small dask graph and stream chunk by chunk.
+        """
+        if da.chunks is not None:
+            chunks = da.chunksizes["time"]
+            if any(chunk % n for chunk in chunks[:-1]):
+                da = da.chunk({"time": max(n, chunks[0] - chunks[0] % n)})
+        time = da.time[::n].dt.floor(freq)
+        blocks = da.coarsen(time=n).construct(time=("time", "step"))
+        reduced = {}
+        for method in methods:
+            reduced[method] = getattr(blocks, method)(dim="step").assign_coords(
+                time=time.values
+            )
+            reduced[method].time.attrs = da.time.attrs
+        return reduced
+
     def _preprocessing(self):
         ds_ = self._convert_to_frequency(self.ds)
         time_control = pyh.time_control(ds_)
@@ -1,3 +1,5 @@
+from copy import deepcopy
+
 import cf_xarray  # noqa
 import cftime  # noqa
 import numpy as np
@@ -6,13 +8,11 @@ import xarray as xr
 from pyhomogenize._consts import freqs as _freq
 from pyhomogenize._consts import frequencies as _tfreq
 
-from . import _indices as indices
-from ._tables import vjson
+from ._chunking import plan_chunks
+from ._consts import _options
+from ._registry import registry
 from ._utils import (
     check_existance,
-    get_alpha_name,
-    get_numb_name,
-    get_replace_name,
     kwargs_to_self,
     normalize_pandas_freq,
     object_attrs_to_self,
@@ -29,6 +29,72 @@ class Processing:
         Climate indicator name to be calculated.
     preproc_obj: index_calculator.preprocessing
         ``index_calculator.preprocessing`` object
+    percentile_cache: str, optional
+        Directory in which percentile reference values are cached
+        and reused by every index and every later run. The percentiles
+        are identified by the values of the base period, not by the input
+        files or their chunking. Identifying them reads the base period
+        once.
+        If None (default) percentiles are not cached on disk.
+    percentile_cache_size: int or str (default: "10GB"), optional
+        Maximum size of `percentile_cache`. If exceeded, the least
+        recently used percentiles are deleted.
+    memo_size: int or str (default: "1GB"), optional
+        Maximum total size of the intermediate results (e.g. percentiles)
+        memoized in-process and shared by all indices of one
+        ``index_calculator`` or ``batch`` run. If exceeded, the least
+        recently used results are deleted. All memoized results are
+        deleted when the run ends.
+    fused: bool, optional
+        If True, all threshold-count indices (e.g. FD, SU, TR, R10mm) of
+        the same input variable are counted in one single pass and reused
+        by every following index of that family. Likewise, the compound
+        indices CD, CW, WD and WW are counted together from the shared
+        `tas` and `pr` percentiles. If `spell_backend` is "numba", the
+        spells of all spell indices with the same spell mask (e.g. HWf,
+        HWx, HWn) are detected once for all of their minimum lengths.
+    spell_backend: {"xclim", "numba"}, optional
+        Run-length backend of the consecutive-spell indices (e.g. CDD,
+        CWD, DSx, CSf, HSn, HWf). If "numba", a compiled kernel computes
+        maximum spell length, total spell length and number of spells
+        in one pass per period. Default is "xclim". The "numba" backend
+        needs the optional dependency numba
+        (``pip install index_calculator[numba]``). Without it, "xclim" is
+        used instead.
+    percentile_engine: {"xclim", "partition"}, optional
+        Engine of the day-of-year percentiles of the percentile-based
+        indices (e.g. TX90p, TN10p, WSDI, CSDI, R95p). If "partition", a
+        compiled kernel selects the order statistics of each grid point
+        and day of year without stacking the moving window samples and
+        without disabling dask's ``split_large_chunks``. The percentiles
+        are identical to xclim's. Default is "xclim". Like the "numba"
+        spell backend, "partition" needs numba and falls back to "xclim"
+        without it.
+        If "partition" and `bootstrap` is True,
+        the percentiles of all bootstrapped base periods of one in-base
+        year are merged from one shared selection instead of being
+        recomputed for every replicate, and the years are computed in
+        parallel. For precipitation, the bootstrapped base periods are
+        filtered for wet days like the base period itself.
+    bootstrap: bool, optional
+        If True, the in-base years of the percentile-based indices
+        (e.g. TX90p, R95p) are computed with bootstrapped base periods
+        like xclim's ``bootstrap=True``. The base period has to overlap
+        the studied period partly. Default is False.
+    percentile_doy_block: int, optional
+        Only used if `percentile_engine` is "partition". If set, the
+        base period is streamed in blocks of `percentile_doy_block` days
+        of year. Every block reads only its moving window time steps of
+        all base years. Apart from the percentiles themselves, peak
+        memory is bounded by about ``(percentile_doy_block + 4) / 365``
+        of the base period, even if the whole base period does not fit
+        into memory. The percentiles do not change.
+    chunk_budget: int or str, optional
+        Maximum size of one chunk either in bytes or as a string like
+        "256MB". If set, the pre-processed dataset is rechunked depending
+        on the index family (percentile, spell, rolling, count, aggregate)
+        before computing the climate index. The chosen chunks are stored
+        in `chunk_plan`. If None (default) the input chunking is kept.
 
     Example
     -------
@@ -66,34 +132,17 @@ class Processing:
         self.proc = self._processing()
 
     def _get_numb_name_and_idx_object(self):
-        alpha_name = get_alpha_name(self.CIname)
-        numb_name = get_numb_name(self.CIname)
-        replace_name = get_replace_name(self.CIname)
-        if hasattr(indices, self.CIname):
-            idx_object = getattr(indices, self.CIname)
-            self.IDXname = self.CIname
-            numb_name = ""
-        elif hasattr(indices, alpha_name):
-            idx_object = getattr(indices, alpha_name)
-            self.IDXname = alpha_name
-        elif hasattr(indices, replace_name):
-            idx_object = getattr(indices, replace_name)
-            self.IDXname = replace_name
-        else:
-            raise NameError(f"{self.CIname} not defined.")
-        return numb_name, idx_object()
+        entry, numb_name = registry.resolve(self.CIname)
+        self.IDXname = entry.name
+        self._entry = entry
+        return numb_name, entry.cls()
 
-    def _get_replacement(self, obj, numb_name):
+    def _get_replacement(self, defaults, numb_name):
         replacement = {}
-        for attr in dir(obj):
-            if attr[0] == "_":
-                continue
-            if callable(getattr(obj, attr)):
-                continue
+        for attr, default_value in defaults.items():
             if attr in self.kwargs.keys():
                 replacement[attr] = self.kwargs[attr]
             elif numb_name:
-                default_value = getattr(obj, attr)
                 if isinstance(default_value, (int, str, float)):
                     default_value = float(default_value)
                     if default_value < 0:
@@ -102,7 +151,7 @@ class Processing:
                     continue
                 replacement[attr] = float(numb_name)
             else:
-                replacement[attr] = getattr(obj, attr)
+                replacement[attr] = default_value
             if isinstance(replacement[attr], list):
                 continue
             if isinstance(replacement[attr], str):
@@ -119,10 +168,11 @@ class Processing:
 
     def _get_idx_name_and_repl(self):
         numb_name, idx_object = self._get_numb_name_and_idx_object()
-        defaults = [attr for attr in dir(idx_object)]
+        defaults = deepcopy(self._entry.defaults)
         object_attrs_to_self(idx_object, self, overwrite=False)
+        self._family = self._entry.family
         self.replacement = self._get_replacement(
-            idx_object,
+            defaults,
             numb_name,
         )
         for k, v in self.replacement.items():
@@ -150,15 +200,16 @@ class Processing:
             "freq": normalize_pandas_freq(_freq[self.freq]),
         }
         params.update(self.replacement)
+        params.update({k: v for k, v in self.kwargs.items() if k in _options})
         return params
 
     def _processing(self):
         """Calculate climate index."""
         ds = self.preproc
         conv_vars = ConvertVariables(ds, **self.kwargs)
-        input_variables = vjson[self.IDXname]
-        if isinstance(input_variables, str):
-            input_variables = [input_variables]
+        input_variables = self._entry.input_variables
+        if input_variables is None:
+            raise NameError(f"Input variables of {self.IDXname} not defined.")
         for input_variable in input_variables:
             if input_variable in ds.data_vars:
                 continue
@@ -170,6 +221,15 @@ class Processing:
                 )
             ds[input_variable] = getattr(conv_vars, input_variable)()
 
+        self.chunk_plan = None
+        if self.kwargs.get("chunk_budget") is not None:
+            self.chunk_plan = plan_chunks(
+                ds,
+                self._family,
+                budget=self.kwargs["chunk_budget"],
+            )
+            ds = self.preproc = ds.chunk(self.chunk_plan)
+
         dvars = ds.data_vars
         data_vars = {
             k: v
@@ -0,0 +1,151 @@
+import inspect
+import threading
+
+from . import _indices as indices
+from ._chunking import get_index_family
+from ._climate_indicator import ClimateIndicator
+from ._tables import vjson
+from ._utils import get_alpha_name, get_numb_name, get_replace_name
+
+
+class IndexEntry:
+    """Registry entry of one climate index class.
+
+    Parameters
+    ----------
+    cls: type
+        Climate index class of ``index_calculator._indices``.
+
+    Attributes
+    ----------
+    name: str
+        Class name, e.g. "TG" or templated "RYYmm".
+    defaults: dict
+        Default parameters of the climate index sorted by name.
+    input_variables: list
+        Input variables from `input_vars.json`.
+        None if the climate index is not listed.
+    family: str
+        Index family (see :func:`get_index_family`).
+    """
+
+    def __init__(self, cls):
+        obj = cls()
+        self.name = cls.__name__
+        self.cls = cls
+        self.defaults = {
+            k: v
+            for k, v in sorted(vars(obj).items())
+            if k[0] != "_" and not callable(v)
+        }
+        input_variables = vjson.get(self.name)
+        if isinstance(input_variables, str):
+            input_variables = [input_variables]
+        self.input_variables = input_variables
+        self.family = get_index_family(obj)
+
+    def __repr__(self):
+        return f"IndexEntry({self.name})"
+
+
+class IndexRegistry:
+    """Registry of all climate index classes.
+
+    The registry is built once on first access. Concrete names like
+    "TG", alphabetic names like "RXday" of "RX5day" and templated names
+    like "RYYmm" of "R10mm" are resolved to their registry entries.
+    Resolved names are cached.
+
+    Example
+    -------
+    Resolve climate index name::
+
+        from index_calculator._registry import registry
+
+        entry, numb_name = registry.resolve("R10mm")
+        entry.name, entry.defaults, entry.input_variables
+    """
+
+    def __init__(self):
+        self._entries = None
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        """Get registry entries by class name."""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._build()
+        return self._entries
+
+    def _build(self):
+        entries = {}
+        for name, cls in vars(indices).items():
+            if not inspect.isclass(cls) or cls is ClimateIndicator:
+                continue
+            if issubclass(cls, ClimateIndicator):
+                entries[name] = IndexEntry(cls)
+        return entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, index):
+        try:
+            self.resolve(index)
+        except NameError:
+            return False
+        return True
+
+    def resolve(self, index):
+        """Resolve climate index name.
+
+        Parameters
+        ----------
+        index: str
+            Climate index name, e.g. "TG", "RX5day" or "R95pTOT".
+
+        Returns
+        -------
+        tuple
+            Registry entry and number of the climate index name.
+            The number is empty for concrete names.
+        """
+        resolved = self._resolved.get(index)
+        if resolved is not None:
+            return resolved
+        entries = self.entries
+        numb_name = get_numb_name(index)
+        if index in entries:
+            resolved = (entries[index], "")
+        elif get_alpha_name(index) in entries:
+            resolved = (entries[get_alpha_name(index)], numb_name)
+        elif get_replace_name(index) in entries:
+            resolved = (entries[get_replace_name(index)], numb_name)
+        else:
+            raise NameError(f"{index} not defined.")
+        self._resolved[index] = resolved
+        return resolved
+
+    def validate(self, indices):
+        """Check that all climate `indices` are defined.
+
+        Raises
+        ------
+        NameError
+            If any climate index is not defined or has no input variables.
+        """
+        unknown = []
+        for index in indices:
+            if index not in self or self.resolve(index)[0].input_variables is None:
+                unknown.append(index)
+        if unknown:
+            raise NameError(f"{', '.join(unknown)} not defined.")
+
+
+registry = IndexRegistry()
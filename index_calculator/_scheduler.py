@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+
+import dask
+
+from ._consts import _schedulers
+
+
+@contextmanager
+def dask_scheduler(
+    scheduler=None,
+    n_workers=None,
+    threads_per_worker=None,
+    memory_limit=None,
+    address=None,
+):
+    """Set up dask scheduler for the duration of the context.
+
+    Parameters
+    ----------
+    scheduler: {"synchronous", "threads", "processes", "local", "distributed"}
+        Dask scheduler. "synchronous", "threads" and "processes" select
+        dask's local schedulers. "local" starts a
+        ``dask.distributed.LocalCluster`` and "distributed" connects to
+        the running scheduler at `address`. If None (default) and
+        `address` is set, "distributed" is used, otherwise dask's
+        default scheduler is kept.
+    n_workers: int, optional
+        Number of workers of "threads", "processes" and "local".
+    threads_per_worker: int, optional
+        Number of threads per worker of "local".
+    memory_limit: str or int, optional
+        Memory limit per worker of "local", e.g. "4GB".
+    address: str, optional
+        Address of a running dask scheduler, e.g. "tcp://127.0.0.1:8786".
+
+    Yields
+    ------
+    dask.distributed.Client or None
+        Client of "local" and "distributed", otherwise None.
+    """
+    if scheduler is None and address is not None:
+        scheduler = "distributed"
+    if scheduler is None:
+        yield
+        return
+    if scheduler not in _schedulers:
+        raise ValueError(
+            f"Scheduler {scheduler} not supported. Please select one of {_schedulers}."
+        )
+    if scheduler in ["synchronous", "threads", "processes"]:
+        config = {"scheduler": scheduler}
+        if n_workers is not None:
+            config["num_workers"] = n_workers
+        with dask.config.set(**config):
+            yield
+        return
+
+    from dask.distributed import Client, LocalCluster
+
+    if scheduler == "distributed":
+        if address is None:
+            raise ValueError(
+                "Please select the address of a running dask scheduler. 'address=...'"
+            )
+        with Client(address) as client:
+            yield client
+        return
+    cluster_kwargs = {
+        "n_workers": n_workers,
+        "threads_per_worker": threads_per_worker,
+        "memory_limit": memory_limit,
+    }
+    cluster_kwargs = {k: v for k, v in cluster_kwargs.items() if v is not None}
+    with LocalCluster(**cluster_kwargs) as cluster, Client(cluster) as client:
+        yield client
@@ -23,9 +23,20 @@ def read_from_json(jsfile):
         return json.load(f)
 
 
-mjson = read_from_json("tables/metadata.json")
-xjson = read_from_json("tables/xcalc.json")
-pjson = read_from_json("tables/projects.json")
-vjson = read_from_json("tables/input_vars.json")
-cfjson = read_from_json("tables/cf_conversion.json")
-fjson = read_from_json("tables/convert_to_frequency.json")
+_tables = {
+    "mjson": "tables/metadata.json",
+    "xjson": "tables/xcalc.json",
+    "pjson": "tables/projects.json",
+    "vjson": "tables/input_vars.json",
+    "cfjson": "tables/cf_conversion.json",
+    "fjson": "tables/convert_to_frequency.json",
+}
+
+
+def __getattr__(name):
+    """Read json tables on first access."""
+    if name not in _tables:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    table = read_from_json(_tables[name])
+    globals()[name] = table
+    return table
@@ -0,0 +1,115 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import dask
+import xarray as xr
+
+from ._consts import _horizontal_dims
+
+
+def get_horizontal_dims(ds):
+    """Get horizontal dimensions of `ds`."""
+    return [dim for dim in _horizontal_dims if dim in ds.dims]
+
+
+def get_tiles(ds, tile_size):
+    """Split horizontal dimensions of `ds` into tiles.
+
+    Parameters
+    ----------
+    ds: xr.Dataset
+        Input dataset.
+    tile_size: int or dict
+        Maximum number of grid points per tile along each horizontal
+        dimension. If dict, map dimension names to tile sizes;
+        dimensions not mentioned are not split.
+
+    Returns
+    -------
+    tuple
+        List of tiles as ``isel`` dictionaries in row-major order
+        and number of tiles along each horizontal dimension.
+    """
+    dims = get_horizontal_dims(ds)
+    if not isinstance(tile_size, dict):
+        tile_size = {dim: tile_size for dim in dims}
+    slices = []
+    for dim in dims:
+        length = ds.sizes[dim]
+        size = tile_size.get(dim) or length
+        slices.append([slice(start, start + size) for start in range(0, length, size)])
+    tiles = [dict(zip(dims, tile)) for tile in itertools.product(*slices)]
+    return tiles, [len(s) for s in slices]
+
+
+def _nest(items, shape):
+    if len(shape) <= 1:
+        return list(items)
+    n = len(items) // shape[0]
+    return [_nest(items[i * n : (i + 1) * n], shape[1:]) for i in range(shape[0])]
+
+
+def stitch_tiles(tiles, shape, dims):
+    """Combine computed tiles to one dataset.
+
+    Variables without horizontal dimensions (e.g. time bounds or grid
+    mappings) are taken from the first tile.
+    """
+    if not dims:
+        return tiles[0]
+    return xr.combine_nested(
+        _nest(tiles, shape),
+        concat_dim=dims,
+        data_vars="minimal",
+        coords="minimal",
+        compat="override",
+        join="override",
+        combine_attrs="override",
+    )
+
+
+def compute_tiled(func, ds, tile_size, max_tiles=1):
+    """Run `func` on each tile of `ds` and stitch the results.
+
+    Each tile is computed completely before its result is kept, so peak
+    memory depends on tile size and `max_tiles` instead of domain size.
+
+    Parameters
+    ----------
+    func: callable
+        Function taking a tile dataset and returning an
+        ``index_calculator.postprocessing`` object.
+    ds: xr.Dataset
+        Input dataset.
+    tile_size: int or dict
+        Tile size (see :func:`get_tiles`).
+    max_tiles: int (default: 1), optional
+        Maximum number of tiles computed concurrently.
+
+    Returns
+    -------
+    index_calculator.postprocessing
+        Post-processing object of the first tile containing
+        the stitched climate index dataset(s).
+    """
+    dims = get_horizontal_dims(ds)
+    tiles, shape = get_tiles(ds, tile_size)
+
+    def compute_tile(tile):
+        postproc_obj = func(ds.isel(tile))
+        (postproc_obj.postproc,) = dask.compute(postproc_obj.postproc)
+        return postproc_obj
+
+    with ThreadPoolExecutor(max_workers=max_tiles) as executor:
+        postproc_objs = list(executor.map(compute_tile, tiles))
+
+    postproc_obj = postproc_objs[0]
+    postprocs = [obj.postproc for obj in postproc_objs]
+    if isinstance(postproc_obj.postproc, list):
+        postproc_obj.postproc = [
+            stitch_tiles(list(parts), shape, dims) for parts in zip(*postprocs)
+        ]
+    else:
+        postproc_obj.postproc = stitch_tiles(postprocs, shape, dims)
+    postproc_obj.ds = ds
+    return postproc_obj
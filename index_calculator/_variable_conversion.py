@@ -1,7 +1,5 @@
 import inspect
 
-import xclim as xc
-
 
 class ConvertVariables:
     def __init__(self, ds, **params):
@@ -13,10 +11,14 @@ class ConvertVariables:
         return {k: v for k, v in params.items() if k in fparams.keys()}
 
     def sfcWind(self):
+        import xclim as xc
+
         return xc.indicators.convert.wind_speed_from_vector(
             ds=self.ds,
         )[0]
 
     def snd(self):
+        import xclim as xc
+
         params = self._params(xc.land.snw_to_snd, self.params)
         return xc.land.snw_to_snd(ds=self.ds, **params)
@@ -3,11 +3,12 @@
 import argparse
 import sys
 
-import dask  # noqa
-from dask.distributed import Client
 from pyhomogenize import open_xrdataset
 
 import index_calculator as xcalc
+from index_calculator._consts import _schedulers
+from index_calculator._manifest import read_manifest, run_manifest
+from index_calculator._scheduler import dask_scheduler
 
 
 def _parser():
@@ -68,6 +69,76 @@ def _parser():
         default=True,
         help="netCDF output file name. Necessary if project is not selected.",
     )
+    parser.add_argument(
+        "-enc",
+        "--encoding_profile",
+        dest="encoding_profile",
+        default=None,
+        choices=["archive", "fast-read-timeseries", "fast-read-maps"],
+        help="compression and storage profile of the output file",
+    )
+    parser.add_argument(
+        "--derive_variables",
+        dest="derive_variables",
+        action="store_true",
+        help="derive daily tasmax, tasmin and tas from sub-daily tas",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        dest="bootstrap",
+        action="store_true",
+        help="bootstrap in-base years of percentile-based climate indices",
+    )
+    parser.add_argument(
+        "--scheduler",
+        dest="scheduler",
+        default=None,
+        choices=_schedulers,
+        help="dask scheduler; 'local' starts a LocalCluster",
+    )
+    parser.add_argument(
+        "--n_workers",
+        dest="n_workers",
+        type=int,
+        default=None,
+        help="number of dask workers",
+    )
+    parser.add_argument(
+        "--threads_per_worker",
+        dest="threads_per_worker",
+        type=int,
+        default=None,
+        help="number of threads per dask worker of a LocalCluster",
+    )
+    parser.add_argument(
+        "--memory_limit",
+        dest="memory_limit",
+        default=None,
+        help="memory limit per dask worker of a LocalCluster, e.g. 4GB",
+    )
+    parser.add_argument(
+        "--scheduler_address",
+        dest="address",
+        default=None,
+        help="address of a running dask scheduler",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    run = subparsers.add_parser(
+        "run",
+        help="calculate climate indices of all tasks of a YAML manifest",
+    )
+    run.add_argument(
+        "manifest",
+        help="YAML manifest file name",
+    )
+    run.add_argument(
+        "-n",
+        "--workers",
+        dest="workers",
+        type=int,
+        default=None,
+        help="number of datasets processed concurrently",
+    )
     return parser
 
 
@@ -82,17 +153,48 @@ def _args_to_xcalc(args):
         institution_id=args.institution_id,
         contact=args.contact,
         output=args.output,
-    ).compute(write=True)
+        encoding_profile=args.encoding_profile,
+        derive_variables=args.derive_variables,
+        bootstrap=args.bootstrap,
+        write=True,
+    )
+
+
+def _dask_config(args, config=None):
+    """Merge dask section of config file with command line options."""
+    config = dict(config or {})
+    for key in [
+        "scheduler",
+        "n_workers",
+        "threads_per_worker",
+        "memory_limit",
+        "address",
+    ]:
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    return config
+
+
+def _run_manifest(args, manifest):
+    failures = run_manifest(manifest, workers=args.workers)
+    for files, e in failures.items():
+        print(f"Failed: {', '.join(files)}: {e}", file=sys.stderr)
+    return 1 if failures else 0
 
 
 def main():
     parser = _parser()
     args = parser.parse_args()
 
-    _args_to_xcalc(args)
+    if args.command == "run":
+        manifest = read_manifest(args.manifest)
+        with dask_scheduler(**_dask_config(args, manifest.get("dask"))):
+            return _run_manifest(args, manifest)
+    with dask_scheduler(**_dask_config(args)):
+        _args_to_xcalc(args)
     return 0
 
 
 if __name__ == "__main__":
-    with Client() as client:
-        sys.exit(main())  # pragma: no cover
+    sys.exit(main())  # pragma: no cover
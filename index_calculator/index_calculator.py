@@ -1,9 +1,12 @@
 """Main module."""
 
+from ._cache import memo_scope
+from ._metrics import Metrics, get_task_count
 from ._outputwriter import OutputWriter as outputwriter
 from ._postprocessing import PostProcessing as postprocessing
 from ._preprocessing import PreProcessing as preprocessing
 from ._processing import Processing as processing
+from ._tiling import compute_tiled
 from ._utils import kwargs_to_self, object_attrs_to_self
 
 
@@ -14,6 +17,30 @@ class IndexCalculator:
     ----------
     write: bool (default: False), optional
         If True write climate index dataset on disk.
+    tile_size: int or dict, optional
+        If set, split the horizontal dimensions (e.g. rlat/rlon or lat/lon)
+        of `ds` into tiles of at most `tile_size` grid points. The whole
+        chain from pre-processing to post-processing is computed tile by
+        tile and the tiles are stitched to one output dataset.
+        Use a dict to set tile sizes per dimension, e.g.
+        ``{"rlat": 100, "rlon": 100}``.
+    max_tiles: int (default: 1), optional
+        Maximum number of tiles computed concurrently.
+        Only used if `tile_size` is set.
+    metrics_file: str, optional
+        If set, append the metrics of all stages as JSON lines
+        to this file.
+
+    Attributes
+    ----------
+    metrics: index_calculator._metrics.Metrics
+        Wall time, peak memory, number of dask tasks and bytes read
+        and written of the stages "preprocessing", "processing",
+        "postprocessing" and "output". Pre-, processing and
+        post-processing build the dask graph; it is computed while
+        writing the output. If `tile_size` is set, these stages are
+        recorded per tile and the stage "tiles" covers the computation
+        of all tiles.
 
     Notes
     -----
@@ -53,19 +80,66 @@ class IndexCalculator:
 
     """
 
-    def __init__(self, write=False, **kwargs):
+    def __init__(
+        self,
+        write=False,
+        tile_size=None,
+        max_tiles=1,
+        metrics_file=None,
+        **kwargs,
+    ):
         kwargs_to_self(kwargs, self)
-        postproc_obj = self._compute(write=write, **kwargs)
+        self.metrics = Metrics()
+        with memo_scope():
+            if tile_size is None:
+                postproc_obj = self._compute(write=write, **kwargs)
+            else:
+                postproc_obj = self._compute_tiled(
+                    tile_size, max_tiles=max_tiles, write=write, **kwargs
+                )
         object_attrs_to_self(postproc_obj, self)
+        if metrics_file is not None:
+            self.metrics.to_jsonl(metrics_file)
 
-    def _compute(self, write=False, **kwargs):
-        """Compute climate index."""
-        preproc_obj = preprocessing(**kwargs)
-        proc_obj = processing(preproc_obj=preproc_obj)
-        postproc_obj = postprocessing(proc_obj=proc_obj)
-        if write is True:
+    def _postprocessing(self, **kwargs):
+        index = kwargs.get("index")
+        with self.metrics.stage("preprocessing", index) as record:
+            preproc_obj = preprocessing(**kwargs)
+            record["dask_tasks"] = get_task_count(preproc_obj.preproc)
+        with self.metrics.stage("processing", index) as record:
+            proc_obj = processing(preproc_obj=preproc_obj)
+            record["dask_tasks"] = get_task_count(proc_obj.proc)
+        with self.metrics.stage("postprocessing", index) as record:
+            postproc_obj = postprocessing(proc_obj=proc_obj)
+            record["dask_tasks"] = get_task_count(postproc_obj.postproc)
+        return postproc_obj
+
+    def _write(self, postproc_obj, **kwargs):
+        with self.metrics.stage("output", kwargs.get("index")) as record:
+            record["dask_tasks"] = get_task_count(postproc_obj.postproc)
             outputwriter(
                 postproc_obj=postproc_obj,
                 **kwargs,
             )
+
+    def _compute(self, write=False, **kwargs):
+        """Compute climate index."""
+        postproc_obj = self._postprocessing(**kwargs)
+        if write is True:
+            self._write(postproc_obj, **kwargs)
+        return postproc_obj
+
+    def _compute_tiled(self, tile_size, max_tiles=1, write=False, **kwargs):
+        """Compute climate index tile by tile."""
+        if kwargs.get("ds") is None:
+            raise ValueError("Please select an input xarray dataset. 'ds=...'")
+        with self.metrics.stage("tiles", kwargs.get("index")):
+            postproc_obj = compute_tiled(
+                lambda ds: self._postprocessing(**{**kwargs, "ds": ds}),
+                kwargs["ds"],
+                tile_size,
+                max_tiles=max_tiles,
+            )
+        if write is True:
+            self._write(postproc_obj, **kwargs)
         return postproc_obj
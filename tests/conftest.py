@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pooch
 import xarray as xr
@@ -369,3 +370,15 @@ def mrt_series(values, **kwargs):
         )
 
     return _mrt_series(values, **kwargs)
+
+
+def tasmin_xarray(series=(-11, -26, -4, 1, 24, -3, -12), **kwargs):
+    return tasmin_series(np.array(series) + 273.15, **kwargs)
+
+
+def tasmax_xarray(series=(-1, -10, 0, 15, 32, 6, -8), **kwargs):
+    return tasmax_series(np.array(series) + 273.15, **kwargs)
+
+
+def pr_xarray(series=(3, 4, 20, 20, 0, 6, 9), **kwargs):
+    return pr_series(np.array(series) / 86400, **kwargs)
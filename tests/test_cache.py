@@ -0,0 +1,171 @@
+import threading
+
+import numpy as np
+import pytest  # noqa
+
+import index_calculator._indices as indices
+from index_calculator._cache import (
+    Memo,
+    PercentileCache,
+    get_content_key,
+    get_key,
+    memo_scope,
+    percentile_memo,
+)
+
+from .conftest import pr_xarray, tasmax_xarray
+
+
+def test_percentile_cache(tmp_path):
+    percentile_memo.clear()
+    idx_class = indices.TX90p()
+    result = idx_class.compute(
+        tasmax=tasmax_xarray(),
+        freq="7D",
+        base_period_time_range=["2000-01-01", "2000-01-07"],
+        percentile_cache=str(tmp_path),
+    )
+    assert len(list(tmp_path.glob("*.nc"))) == 1
+    cached = idx_class.compute(
+        tasmax=tasmax_xarray(),
+        freq="7D",
+        base_period_time_range=["2000-01-01", "2000-01-07"],
+        percentile_cache=str(tmp_path),
+    )
+    assert len(list(tmp_path.glob("*.nc"))) == 1
+    np.testing.assert_allclose(result, cached)
+
+
+def test_percentile_cache_eviction(tmp_path):
+    cache = PercentileCache(tmp_path, max_size=1)
+    for i in range(3):
+        da = tasmax_xarray(series=[i] * 7)
+        cache.put(get_key(da), da)
+    assert len(list(tmp_path.glob("*.nc"))) == 1
+    assert cache.get(get_key(tasmax_xarray(series=[0] * 7))) is None
+    assert cache.get(get_key(da)) is not None
+
+
+def test_percentile_memo():
+    percentile_memo.clear()
+    tx10p = indices.TX10p().compute(
+        tasmax=tasmax_xarray(),
+        freq="7D",
+        base_period_time_range=["2000-01-01", "2000-01-07"],
+    )
+    assert len(percentile_memo._memo) == 1
+    per_doy = next(iter(percentile_memo._memo.values()))
+    np.testing.assert_array_equal(per_doy.percentiles, [10, 25, 75, 90])
+    tx90p = indices.TX90p().compute(
+        tasmax=tasmax_xarray(),
+        freq="7D",
+        base_period_time_range=["2000-01-01", "2000-01-07"],
+    )
+    assert len(percentile_memo._memo) == 1
+    np.testing.assert_allclose(tx10p, 0, rtol=1e-03)
+    np.testing.assert_allclose(tx90p, 0, rtol=1e-03)
+
+
+def test_percentile_memo_extend():
+    percentile_memo.clear()
+    pr = pr_xarray()
+    kwargs = {"freq": "7D", "base_period_time_range": ["2000-01-01", "2000-01-07"]}
+    indices.RRYYp().compute(pr=pr, per=75, **kwargs)
+    result = indices.RRYYp().compute(pr=pr, per=97, **kwargs)
+    assert len(percentile_memo._memo) == 1
+    per_doy = next(iter(percentile_memo._memo.values()))
+    assert 97 in per_doy.percentiles.values
+    assert 75 in per_doy.percentiles.values
+    assert result.percentiles == 97
+
+
+def test_memo_max_bytes():
+    memo = Memo()
+    memo.put(0, tasmax_xarray())
+    memo.resize(2 * memo.nbytes)
+    for i in range(3):
+        memo.put(i, tasmax_xarray(series=[i] * 7))
+    assert list(memo._memo) == [1, 2]
+    assert memo.nbytes <= memo.max_bytes
+    memo.put("large", tasmax_xarray(series=[0] * 30))
+    assert memo.get("large") is None
+    memo.clear()
+    lazy = tasmax_xarray().chunk()
+    memo.put("lazy", lazy)
+    assert memo.nbytes == lazy.time.nbytes
+    memo.resize("0B")
+    assert len(memo._memo) == 0
+
+
+def test_memo_threads():
+    memo = Memo(maxsize=4)
+
+    def put(i):
+        for j in range(200):
+            memo.put((i, j), j)
+            memo.get((i, j - 1))
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(memo._memo) == 4
+
+
+def test_memo_scope():
+    percentile_memo.clear()
+    kwargs = {
+        "tasmax": tasmax_xarray(),
+        "freq": "7D",
+        "base_period_time_range": ["2000-01-01", "2000-01-07"],
+    }
+    with memo_scope():
+        with memo_scope():
+            indices.TX90p().compute(**kwargs)
+        assert len(percentile_memo._memo) == 1
+    assert len(percentile_memo._memo) == 0
+    indices.TX90p().compute(memo_size=0, **kwargs)
+    assert len(percentile_memo._memo) == 0
+
+
+def test_percentile_cache_chunking(tmp_path):
+    percentile_memo.clear()
+    tasmax = tasmax_xarray()
+    kwargs = {
+        "freq": "7D",
+        "base_period_time_range": ["2000-01-01", "2000-01-07"],
+        "percentile_cache": str(tmp_path),
+    }
+    result = indices.TX90p().compute(tasmax=tasmax.chunk(time=2), **kwargs)
+    percentile_memo.clear()
+    cached = indices.TX90p().compute(tasmax=tasmax.chunk(time=3), **kwargs)
+    assert len(list(tmp_path.glob("*.nc"))) == 1
+    np.testing.assert_allclose(result, cached)
+    indices.TX90p().compute(tasmax=tasmax, **kwargs)
+    assert len(list(tmp_path.glob("*.nc"))) == 1
+
+
+def test_percentile_memo_without_cache(monkeypatch):
+    def get_content_key(da, **kwargs):
+        raise AssertionError("base period checksummed without cache")
+
+    monkeypatch.setattr(
+        "index_calculator._climate_indicator.get_content_key", get_content_key
+    )
+    percentile_memo.clear()
+    indices.TX90p().compute(
+        tasmax=tasmax_xarray().chunk(time=2),
+        freq="7D",
+        base_period_time_range=["2000-01-01", "2000-01-07"],
+    )
+    assert len(percentile_memo._memo) == 1
+
+
+def test_get_content_key():
+    tasmax = tasmax_xarray()
+    key = get_content_key(tasmax)
+    assert get_content_key(tasmax.chunk(time=2)) == key
+    assert get_content_key(tasmax.chunk(time=5)) == key
+    assert get_content_key(tasmax_xarray(series=[-1, -10, 0, 32, 15, 6, -8])) != key
+    assert get_content_key(tasmax, window=5) != key
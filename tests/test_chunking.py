@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+import index_calculator._indices as indices
+from index_calculator._chunking import get_index_family, plan_chunks
+
+
+def grid_dataset(ntime=730, nrlat=100, nrlon=120):
+    return xr.Dataset(
+        data_vars={
+            "tas": (
+                ("time", "rlat", "rlon"),
+                np.zeros((ntime, nrlat, nrlon), dtype="float32"),
+            ),
+        },
+        coords={
+            "time": np.arange(ntime),
+            "rlat": np.arange(nrlat),
+            "rlon": np.arange(nrlon),
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "index,family",
+    [
+        ("TX90p", "percentile"),
+        ("CDD", "spell"),
+        ("RXYYday", "rolling"),
+        ("FD", "count"),
+        ("TG", "aggregate"),
+    ],
+)
+def test_get_index_family(index, family):
+    assert get_index_family(getattr(indices, index)()) == family
+
+
+def test_plan_chunks():
+    ds = grid_dataset()
+    chunks = plan_chunks(ds, "percentile", budget=730 * 400 * 4)
+    assert chunks == {"rlat": 20, "rlon": 20, "time": 730}
+    chunks = plan_chunks(ds, "count", budget=365 * 2500 * 4)
+    assert chunks == {"rlat": 50, "rlon": 50, "time": 365}
+    chunks = plan_chunks(ds, "count", budget="1GB")
+    assert chunks == {"rlat": 100, "rlon": 120, "time": 730}
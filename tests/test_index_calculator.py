@@ -19,3 +19,23 @@ def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
     # assert 'GitHub' in BeautifulSoup(response.content).title.string
+
+
+def test_index_calculator_after_submodule_import():
+    import subprocess
+    import sys
+
+    code = (
+        "import index_calculator.index_calculator\n"
+        "import index_calculator\n"
+        "assert isinstance(index_calculator.index_calculator, type)\n"
+        "assert index_calculator.index_calculator.__name__ == 'index_calculator'\n"
+        "try:\n"
+        "    index_calculator.index_calculator()\n"
+        "except ValueError as e:\n"
+        "    assert 'input xarray dataset' in str(e)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
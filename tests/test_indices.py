@@ -6,7 +6,7 @@ import index_calculator._indices as indices
 from .conftest import (
     hurs_series,
     mrt_series,
-    pr_series,
+    pr_xarray,
     prsn_series,
     rlds_series,
     rlus_series,
@@ -17,8 +17,8 @@ from .conftest import (
     snd_series,
     snw_series,
     tas_series,
-    tasmax_series,
-    tasmin_series,
+    tasmax_xarray,
+    tasmin_xarray,
 )
 
 
@@ -30,18 +30,6 @@ def tas_c_xarray(series=[-15, -11, 0, 26, -32, 17, -9], **kwargs):
     return tas_series(np.array(series) + 273.15, **kwargs)
 
 
-def tasmin_xarray(series=[-11, -26, -4, 1, 24, -3, -12], **kwargs):
-    return tasmin_series(np.array(series) + 273.15, **kwargs)
-
-
-def tasmax_xarray(series=[-1, -10, 0, 15, 32, 6, -8], **kwargs):
-    return tasmax_series(np.array(series) + 273.15, **kwargs)
-
-
-def pr_xarray(series=[3, 4, 20, 20, 0, 6, 9], **kwargs):
-    return pr_series(np.array(series) / 86400, **kwargs)
-
-
 def prsn_xarray(series=[7, 0, 0.5, 10, 6, 0, 4], **kwargs):
     return prsn_series(np.array(series) / 86400, **kwargs)
 
@@ -0,0 +1,23 @@
+from index_calculator._journal import TaskJournal, get_fingerprint, get_task_key
+
+
+def test_task_journal(tmp_path):
+    input_file = tmp_path / "tas.nc"
+    input_file.write_text("tas")
+    output_file = tmp_path / "TG.nc"
+    output_file.write_text("TG")
+    journal_file = str(tmp_path / "journal.jsonl")
+    key = get_task_key([str(input_file)], "TG", "year", "CORDEX")
+    fingerprint = get_fingerprint([str(input_file)])
+
+    journal = TaskJournal(journal_file)
+    journal.record(key, fingerprint, "started")
+    assert not journal.is_done(key, fingerprint)
+    journal.record(key, fingerprint, "done", outputs=[output_file])
+    assert journal.is_done(key, fingerprint)
+
+    journal = TaskJournal(journal_file)
+    assert journal.is_done(key, fingerprint)
+    assert not journal.is_done(key, "changed input")
+    output_file.unlink()
+    assert not journal.is_done(key, fingerprint)
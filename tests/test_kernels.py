@@ -0,0 +1,345 @@
+import importlib.util
+
+import dask
+import numpy as np
+import pytest
+import xarray as xr
+from xclim.core.bootstrapping import build_bootstrap_year_da
+from xclim.core.calendar import percentile_doy as xclim_percentile_doy
+
+import index_calculator._indices as indices
+from index_calculator._cache import count_memo, percentile_memo, spell_memo
+from index_calculator._kernels import (
+    bootstrap_percentile_doy,
+    bootstrap_sources,
+    percentile_doy,
+    threshold_counts,
+)
+
+from .conftest import (
+    pr_series,
+    pr_xarray,
+    tas_series,
+    tasmax_series,
+    tasmax_xarray,
+    tasmin_series,
+    tasmin_xarray,
+)
+
+
+def assert_metadata(result, expected):
+    """Assert same name, attributes apart from history and coordinates."""
+    assert result.name == expected.name
+    attrs = {k: v for k, v in result.attrs.items() if k != "history"}
+    assert attrs == {k: v for k, v in expected.attrs.items() if k != "history"}
+    xr.testing.assert_identical(
+        result.coords.to_dataset(), expected.coords.to_dataset()
+    )
+
+
+def test_threshold_counts():
+    counts = threshold_counts(
+        tasmin_xarray(),
+        {"FD": ("<", "0 degC"), "TR": (">", "20 degC")},
+        freq="7D",
+    )
+    np.testing.assert_allclose(counts["FD"], 5)
+    np.testing.assert_allclose(counts["TR"], 1)
+    assert counts["FD"].attrs["units"] == "days"
+
+
+@pytest.mark.parametrize(
+    "index,variable,kwargs",
+    [
+        ("FD", "tasmin", {}),
+        ("TR", "tasmin", {}),
+        ("SQI", "tasmin", {}),
+        ("WI", "tasmin", {"thresh": -20}),
+        ("ID", "tasmax", {}),
+        ("SU", "tasmax", {"thresh": 10}),
+        ("RR1", "pr", {}),
+        ("R10mm", "pr", {}),
+        ("R20mm", "pr", {}),
+        ("R25mm", "pr", {}),
+        ("RYYmm", "pr", {"thresh": 6}),
+        ("DD", "pr", {}),
+    ],
+)
+def test_fused_count(index, variable, kwargs):
+    count_memo.clear()
+    data = {
+        "tasmin": tasmin_xarray,
+        "tasmax": tasmax_xarray,
+        "pr": pr_xarray,
+    }[variable]()
+    data.attrs["grid_mapping"] = "rotated_pole"
+    idx_class = getattr(indices, index)()
+    expected = idx_class.compute(**{variable: data}, freq="7D", **kwargs)
+    result = idx_class.compute(**{variable: data}, freq="7D", fused=True, **kwargs)
+    np.testing.assert_allclose(result, expected)
+    assert_metadata(result, expected)
+    assert len(count_memo._memo) == 1
+
+
+def test_fused_count_custom_thresh():
+    count_memo.clear()
+    rng = np.random.default_rng(0)
+    data = tasmin_series(rng.uniform(278, 298, 365))
+    for index in ["TR", "SQI", "TR"]:
+        idx_class = getattr(indices, index)()
+        expected = idx_class.compute(tasmin=data, freq="MS", thresh=15)
+        result = idx_class.compute(tasmin=data, freq="MS", thresh=15, fused=True)
+        np.testing.assert_array_equal(result, expected)
+        assert_metadata(result, expected)
+    for index in ["TR", "SQI"]:
+        idx_class = getattr(indices, index)()
+        expected = idx_class.compute(tasmin=data, freq="MS")
+        result = idx_class.compute(tasmin=data, freq="MS", fused=True)
+        np.testing.assert_array_equal(result, expected)
+        assert_metadata(result, expected)
+
+
+def test_fused_compound():
+    rng = np.random.default_rng(0)
+    pr = np.where(rng.uniform(size=1461) > 0.4, rng.gamma(1, 5, 1461), 0)
+    kwargs = {
+        "tas": tas_series(rng.uniform(263, 293, 1461)),
+        "pr": pr_series(pr / 86400),
+        "freq": "MS",
+        "base_period_time_range": ["2000-01-01", "2002-12-31"],
+    }
+    kwargs["pr"][100:103] = np.nan
+    for variable in ["tas", "pr"]:
+        kwargs[variable].attrs["grid_mapping"] = "rotated_pole"
+    percentile_memo.clear()
+    count_memo.clear()
+    for index in ["CD", "CW", "WD", "WW"]:
+        idx_class = getattr(indices, index)()
+        expected = idx_class.compute(**kwargs)
+        result = idx_class.compute(fused=True, **kwargs)
+        assert expected.sum() > 0
+        np.testing.assert_array_equal(result, expected)
+        assert_metadata(result, expected)
+    assert len(count_memo._memo) == 1
+
+
+@pytest.mark.parametrize(
+    "index,variables,kwargs",
+    [
+        ("CDD", {"pr": (0, 2e-5)}, {}),
+        ("CWD", {"pr": (0, 2e-5)}, {}),
+        ("CFD", {"tasmin": (263, 278)}, {}),
+        ("CSU", {"tasmax": (288, 303)}, {}),
+        ("CHDYYx", {"tasmax": (288, 313)}, {}),
+        ("DSx", {"pr": (0, 2e-5)}, {}),
+        ("DSn", {"pr": (0, 2e-5)}, {}),
+        ("DSf", {"pr": (0, 2e-5)}, {}),
+        ("WSx", {"pr": (0, 2e-5)}, {"window": 2}),
+        ("WSn", {"pr": (0, 2e-5)}, {}),
+        ("WSf", {"pr": (0, 2e-5)}, {}),
+        ("CSx", {"tas": (253, 268)}, {"window": 2}),
+        ("CSn", {"tas": (253, 268)}, {}),
+        ("CSf", {"tas": (253, 268)}, {}),
+        ("HSx", {"tasmax": (298, 313)}, {}),
+        ("HSn", {"tasmax": (298, 313)}, {}),
+        ("HSf", {"tasmax": (298, 313)}, {"window": 2}),
+        ("HWf", {"tasmin": (288, 303), "tasmax": (298, 313)}, {}),
+        ("HWx", {"tasmin": (288, 303), "tasmax": (298, 313)}, {}),
+        ("HWn", {"tasmin": (288, 303), "tasmax": (298, 313)}, {}),
+    ],
+)
+def test_spell_backend(index, variables, kwargs):
+    series = {
+        "pr": pr_series,
+        "tas": tas_series,
+        "tasmin": tasmin_series,
+        "tasmax": tasmax_series,
+    }
+    data = {}
+    for i, (variable, (low, high)) in enumerate(variables.items()):
+        rng = np.random.default_rng(i)
+        data[variable] = series[variable](rng.uniform(low, high, 730))
+        data[variable].attrs["grid_mapping"] = "rotated_pole"
+    idx_class = getattr(indices, index)()
+    expected = idx_class.compute(**data, freq="MS", **kwargs)
+    result = idx_class.compute(**data, freq="MS", spell_backend="numba", **kwargs)
+    assert expected.sum() > 0
+    np.testing.assert_allclose(result, expected)
+    assert_metadata(result, expected)
+
+
+def test_numba_missing(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *args: None if name == "numba" else find_spec(name, *args),
+    )
+    rng = np.random.default_rng(0)
+    data = pr_series(rng.uniform(0, 2e-5, 730))
+    expected = indices.CDD().compute(pr=data, freq="MS")
+    with pytest.warns(UserWarning, match="spell_backend 'numba' needs numba"):
+        result = indices.CDD().compute(pr=data, freq="MS", spell_backend="numba")
+    np.testing.assert_array_equal(result, expected)
+    with pytest.warns(UserWarning, match="percentile_engine 'partition' needs numba"):
+        indices.RYYp().compute(
+            pr=data,
+            per=95,
+            freq="MS",
+            base_period_time_range=["2000-01-01", "2000-12-31"],
+            percentile_engine="partition",
+        )
+
+
+@pytest.mark.parametrize("chunks", [None, {"time": 100}])
+@pytest.mark.parametrize("variable", ["tas", "pr"])
+def test_percentile_doy(variable, chunks):
+    rng = np.random.default_rng(0)
+    if variable == "pr":
+        values = np.where(rng.uniform(size=1097) > 0.4, rng.gamma(1, 5e-5, 1097), 0)
+        da = pr_series(values.astype("float32"))
+        da = da.where(da > 1e-5)
+    else:
+        da = tas_series(rng.uniform(253, 303, 1097).astype("float32"))
+    if chunks:
+        da = da.chunk(chunks)
+    per = [90, 10, 99, 25]
+    with dask.config.set(**{"array.slicing.split_large_chunks": False}):
+        expected = xclim_percentile_doy(da, per=per).compute()
+    result = percentile_doy(da, per=per).compute()
+    np.testing.assert_array_equal(result, expected)
+    np.testing.assert_array_equal(result.percentiles, per)
+    assert result.dayofyear.size == 366
+    assert result.attrs["climatology_bounds"] == expected.attrs["climatology_bounds"]
+
+
+@pytest.mark.parametrize(
+    "index,variable,kwargs",
+    [
+        ("TX90p", "tasmax", {}),
+        ("TN10p", "tasmin", {}),
+        ("WSDI", "tasmax", {"window": 3}),
+        ("CSDI", "tasmin", {"window": 3}),
+        ("RYYp", "pr", {"per": 95}),
+    ],
+)
+def test_percentile_engine(index, variable, kwargs):
+    series = {"tasmin": tasmin_series, "tasmax": tasmax_series, "pr": pr_series}
+    rng = np.random.default_rng(0)
+    data = series[variable](
+        rng.uniform(0, 20, 1461) + (273.15 if variable != "pr" else 0)
+    )
+    if variable == "pr":
+        data = data / 86400
+    kwargs = {
+        "freq": "YS",
+        "base_period_time_range": ["2000-01-01", "2002-12-31"],
+        **kwargs,
+    }
+    idx_class = getattr(indices, index)()
+    percentile_memo.clear()
+    expected = idx_class.compute(**{variable: data}, **kwargs)
+    percentile_memo.clear()
+    result = idx_class.compute(
+        **{variable: data}, percentile_engine="partition", **kwargs
+    )
+    assert expected.sum() > 0
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("chunks", [None, {"time": 100}])
+def test_percentile_doy_block(chunks):
+    rng = np.random.default_rng(0)
+    da = tas_series(rng.uniform(253, 303, 1097).astype("float32"))
+    if chunks:
+        da = da.chunk(chunks)
+    expected = percentile_doy(da, per=[10, 90]).compute()
+    for doy_block in [1, 30, 400]:
+        result = percentile_doy(da, per=[10, 90], doy_block=doy_block)
+        np.testing.assert_array_equal(result, expected)
+
+
+def test_percentile_doy_block_engine():
+    rng = np.random.default_rng(0)
+    kwargs = {
+        "tasmax": tasmax_series(rng.uniform(273, 293, 1461)),
+        "freq": "YS",
+        "base_period_time_range": ["2000-01-01", "2002-12-31"],
+    }
+    percentile_memo.clear()
+    expected = indices.TX90p().compute(percentile_engine="partition", **kwargs)
+    percentile_memo.clear()
+    result = indices.TX90p().compute(
+        percentile_engine="partition", percentile_doy_block=10, **kwargs
+    )
+    np.testing.assert_array_equal(result, expected)
+    percentile_memo.clear()
+    with pytest.raises(ValueError):
+        indices.TX90p().compute(percentile_doy_block=10, **kwargs)
+
+
+@pytest.mark.parametrize("variable", ["tas", "pr"])
+def test_bootstrap_percentile_doy(variable):
+    rng = np.random.default_rng(0)
+    if variable == "pr":
+        values = np.where(rng.uniform(size=1096) > 0.4, rng.gamma(1, 5, 1096), 0)
+        da = pr_series(values.round(0))
+        da = da.where(da > 1)
+    else:
+        da = tas_series(rng.uniform(253, 303, 1096).astype("float32"))
+    per = [90, 10, 50]
+    groups = da.resample(time="YS").groups
+    sources = bootstrap_sources(da.time, "YS")
+    for label in groups:
+        bda = build_bootstrap_year_da(da, groups, label)
+        expected = xclim_percentile_doy.__wrapped__(bda, per=per)
+        start, source = sources[label]
+        result = bootstrap_percentile_doy(da, start, source, per=per)
+        np.testing.assert_array_equal(result.transpose(*expected.dims), expected)
+
+
+@pytest.mark.parametrize("index,variable", [("TX90p", "tasmax"), ("TN10p", "tasmin")])
+def test_bootstrap(index, variable):
+    series = {"tasmin": tasmin_series, "tasmax": tasmax_series}
+    rng = np.random.default_rng(0)
+    kwargs = {
+        variable: series[variable](rng.uniform(273, 293, 1461)),
+        "freq": "YS",
+        "base_period_time_range": ["2000-01-01", "2002-12-31"],
+        "bootstrap": True,
+    }
+    idx_class = getattr(indices, index)()
+    percentile_memo.clear()
+    expected = idx_class.compute(**kwargs)
+    percentile_memo.clear()
+    result = idx_class.compute(percentile_engine="partition", **kwargs)
+    percentile_memo.clear()
+    not_bootstrapped = idx_class.compute(**{**kwargs, "bootstrap": False})
+    np.testing.assert_array_equal(result, expected)
+    assert not np.array_equal(result, not_bootstrapped)
+    assert result.attrs["units"] == expected.attrs["units"]
+
+
+def test_fused_spell():
+    rng = np.random.default_rng(0)
+    data = {
+        "tasmin": tasmin_series(rng.uniform(288, 303, 730)),
+        "tasmax": tasmax_series(rng.uniform(298, 313, 730)),
+    }
+    spell_memo.clear()
+    for index in ["HWf", "HWx", "HWn"]:
+        idx_class = getattr(indices, index)()
+        expected = idx_class.compute(**data, freq="MS")
+        result = idx_class.compute(**data, freq="MS", spell_backend="numba", fused=True)
+        assert expected.sum() > 0
+        np.testing.assert_allclose(result, expected)
+        assert_metadata(result, expected)
+    assert len(spell_memo._memo) == 1
+    stats = spell_memo.get(next(iter(spell_memo._memo)))
+    np.testing.assert_array_equal(stats.window, [1, 3])
+    data = {k: v.chunk(time=200) for k, v in data.items()}
+    expected = indices.HWf().compute(**data, freq="MS")
+    result = indices.HWf().compute(**data, freq="MS", spell_backend="numba")
+    assert result.chunks is not None
+    np.testing.assert_allclose(result, expected)
+    assert_metadata(result, expected)
@@ -0,0 +1,57 @@
+import pytest
+
+from index_calculator._manifest import (
+    expand_inputs,
+    expand_manifest,
+    group_tasks,
+    read_manifest,
+)
+
+
+def _touch(path, names):
+    for name in names:
+        (path / name).touch()
+
+
+def test_expand_inputs(tmp_path):
+    _touch(
+        tmp_path,
+        [
+            "tas_EUR-11_MPI_historical_r1i1p1_day_20010101-20051231.nc",
+            "tas_EUR-11_MPI_historical_r1i1p1_day_20060101-20101231.nc",
+            "pr_EUR-11_MPI_historical_r1i1p1_day_20010101-20051231.nc",
+            "tas_EUR-11_MPI_historical_r2i1p1_day_20010101-20051231.nc",
+        ],
+    )
+    datasets = expand_inputs([f"{tmp_path}/tas_*.nc", f"{tmp_path}/pr_*.nc"])
+    assert [len(files) for files in datasets] == [3, 1]
+    with pytest.raises(FileNotFoundError):
+        expand_inputs(f"{tmp_path}/snw_*.nc")
+
+
+def test_expand_manifest(tmp_path):
+    _touch(
+        tmp_path,
+        [
+            "tas_EUR-11_MPI_historical_r1i1p1_day_20010101-20051231.nc",
+            "tas_EUR-11_MPI_historical_r2i1p1_day_20010101-20051231.nc",
+        ],
+    )
+    manifest_file = tmp_path / "manifest.yaml"
+    manifest_file.write_text(
+        f"inputs: {tmp_path}/tas_*.nc\n"
+        "indices: [TG, TX, TN]\n"
+        "frequencies: [year, mon]\n"
+        "projects: CORDEX\n"
+        "workers: 2\n"
+    )
+    manifest = read_manifest(str(manifest_file))
+    tasks = expand_manifest(manifest)
+    assert len(tasks) == 12
+    groups = group_tasks(tasks)
+    assert len(groups) == 2
+    for group in groups.values():
+        assert group == {
+            ("CORDEX", "year"): ["TG", "TX", "TN"],
+            ("CORDEX", "mon"): ["TG", "TX", "TN"],
+        }
@@ -0,0 +1,51 @@
+import json
+
+import dask.array as da
+import numpy as np
+import pytest
+import xarray as xr
+
+from index_calculator._metrics import (
+    Metrics,
+    _reset_high_water_mark,
+    get_task_count,
+)
+
+
+def test_get_task_count():
+    ds = xr.Dataset({"tas": (("time",), da.ones(10, chunks=5))})
+    assert get_task_count(ds) == 2
+    assert get_task_count([ds, ds.compute()]) == 2
+
+
+def test_metrics(tmp_path):
+    metrics = Metrics()
+    with metrics.stage("processing", "TG") as record:
+        record["dask_tasks"] = 3
+    record = metrics.records[0]
+    assert record["index"] == "TG"
+    assert record["stage"] == "processing"
+    assert record["dask_tasks"] == 3
+    assert record["wall_time"] >= 0
+    assert record["stage_peak_rss"] > 0
+    assert len(metrics.to_dataframe()) == 1
+    metrics_file = tmp_path / "metrics.jsonl"
+    metrics.to_jsonl(metrics_file)
+    metrics.to_jsonl(metrics_file)
+    lines = metrics_file.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["stage"] == "processing"
+
+
+@pytest.mark.skipif(not _reset_high_water_mark(), reason="peak RSS can not be reset")
+def test_metrics_stage_peak_rss():
+    metrics = Metrics()
+    with metrics.stage("outer"):
+        with metrics.stage("large"):
+            large = np.ones(2**24)
+            del large
+        with metrics.stage("small"):
+            pass
+    large, small, outer = metrics.records
+    assert large["stage_peak_rss"] - small["stage_peak_rss"] > 2**26
+    assert outer["stage_peak_rss"] >= large["stage_peak_rss"]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest  # noqa
+import xarray as xr
+
+from index_calculator._preprocessing import PreProcessing
+
+
+def hourly_dataset(start="2007-01-01", periods=24 * 4, freq="h"):
+    time = pd.date_range(start, periods=periods, freq=freq)
+    data = np.random.default_rng(0).normal(283.15, 5, (periods, 2, 3))
+    return xr.Dataset(
+        data_vars={
+            var: (("time", "rlat", "rlon"), data + offset, {"units": "K"})
+            for var, offset in [("tas", 0), ("tasmax", 2), ("tasmin", -2)]
+        },
+        coords={"time": time, "rlat": [0.0, 1.0], "rlon": [0.0, 1.0, 2.0]},
+        attrs={"frequency": "1hr"},
+    )
+
+
+def convert(ds, derive_variables=False):
+    preproc = PreProcessing.__new__(PreProcessing)
+    preproc.ifreq = "day"
+    preproc.derive_variables = derive_variables
+    return preproc._convert_to_frequency(ds)
+
+
+@pytest.mark.parametrize(
+    "start,freq,chunks",
+    [
+        ("2007-01-01", "h", None),
+        ("2007-01-01", "h", {"time": 10}),
+        ("2007-01-01 01:30", "3h", None),
+        ("2007-01-01 05:00", "h", None),
+    ],
+)
+def test_convert_to_frequency(start, freq, chunks):
+    ds = hourly_dataset(start=start, freq=freq)
+    if chunks:
+        ds = ds.chunk(chunks)
+    day = convert(ds)
+    for var, method in [("tas", "mean"), ("tasmax", "max"), ("tasmin", "min")]:
+        expected = getattr(ds[var].resample(time="D"), method)()
+        np.testing.assert_allclose(day[var], expected)
+        np.testing.assert_array_equal(day.time, expected.time)
+        assert day[var].attrs == {"units": "K", "cell_methods": f"time: {method}"}
+    assert day.attrs == ds.attrs
+
+
+@pytest.mark.parametrize("freq", ["h", "5h"])
+def test_derive_variables(freq):
+    ds = hourly_dataset(freq=freq)[["tas"]]
+    ds.tas.attrs["long_name"] = "Near-Surface Air Temperature"
+    day = convert(ds, derive_variables=True)
+    assert sorted(day.data_vars) == ["tas", "tasmax", "tasmin"]
+    for var, method in [("tas", "mean"), ("tasmax", "max"), ("tasmin", "min")]:
+        expected = getattr(ds.tas.resample(time="D"), method)()
+        np.testing.assert_allclose(day[var], expected)
+        assert day[var].attrs["cell_methods"] == f"time: {method}"
+    assert "long_name" in day.tas.attrs
+    assert "long_name" not in day.tasmax.attrs
+    assert list(convert(ds).data_vars) == ["tas"]
+
+
+def test_derive_variables_existing():
+    ds = hourly_dataset()
+    day = convert(ds, derive_variables=True)
+    expected = ds.tasmax.resample(time="D").max()
+    np.testing.assert_allclose(day.tasmax, expected)
+
+
+def test_get_steps_per_period():
+    preproc = PreProcessing.__new__(PreProcessing)
+    ds = hourly_dataset()
+    assert preproc._get_steps_per_period(ds.time, "D") == 24
+    assert preproc._get_steps_per_period(ds.time[1:], "D") is None
+    assert preproc._get_steps_per_period(ds.time[:30], "D") is None
+    assert preproc._get_steps_per_period(ds.time.drop_isel(time=5), "D") is None
@@ -0,0 +1,34 @@
+import pytest
+
+import index_calculator._indices as indices
+from index_calculator._registry import registry
+
+
+@pytest.mark.parametrize(
+    "index, name, numb_name",
+    [
+        ("TG", "TG", ""),
+        ("RX5day", "RXYYday", "5"),
+        ("R95pTOT", "RYYpTOT", "95"),
+        ("CHD35x", "CHDYYx", "35"),
+        ("R10mm", "R10mm", ""),
+        ("R12mm", "RYYmm", "12"),
+    ],
+)
+def test_resolve(index, name, numb_name):
+    entry, numb = registry.resolve(index)
+    assert entry.name == name
+    assert entry.cls is getattr(indices, name)
+    assert numb == numb_name
+
+
+def test_registry():
+    assert "TG" in registry
+    assert "FOO" not in registry
+    entry = registry.entries["SU"]
+    assert entry.defaults["thresh"] == 25
+    assert entry.input_variables == ["tasmax"]
+    assert entry.family == "count"
+    registry.validate(["TG", "R95pTOT"])
+    with pytest.raises(NameError):
+        registry.validate(["TG", "FOO"])
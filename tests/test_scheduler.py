@@ -0,0 +1,18 @@
+import dask
+import pytest
+
+from index_calculator._scheduler import dask_scheduler
+
+
+@pytest.mark.parametrize("scheduler", ["synchronous", "threads", "processes"])
+def test_dask_scheduler(scheduler):
+    with dask_scheduler(scheduler=scheduler, n_workers=2) as client:
+        assert client is None
+        assert dask.config.get("scheduler") == scheduler
+        assert dask.config.get("num_workers") == 2
+    assert dask.config.get("scheduler", None) != scheduler
+
+
+def test_dask_scheduler_unknown():
+    with pytest.raises(ValueError), dask_scheduler(scheduler="mpi"):
+        pass
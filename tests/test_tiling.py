@@ -0,0 +1,39 @@
+import numpy as np
+import pytest  # noqa
+import xarray as xr
+
+from index_calculator._tiling import get_tiles, stitch_tiles
+
+
+def grid_dataset(nrlat=5, nrlon=7):
+    return xr.Dataset(
+        data_vars={
+            "tas": (
+                ("time", "rlat", "rlon"),
+                np.arange(2 * nrlat * nrlon, dtype=float).reshape(2, nrlat, nrlon),
+            ),
+            "time_bnds": (("time", "bnds"), np.zeros((2, 2))),
+        },
+        coords={
+            "time": [0, 1],
+            "rlat": np.arange(nrlat, dtype=float),
+            "rlon": np.arange(nrlon, dtype=float),
+        },
+    )
+
+
+def test_get_tiles():
+    ds = grid_dataset()
+    tiles, shape = get_tiles(ds, 3)
+    assert shape == [2, 3]
+    assert len(tiles) == 6
+    assert tiles[-1] == {"rlat": slice(3, 6), "rlon": slice(6, 9)}
+    tiles, shape = get_tiles(ds, {"rlon": 4})
+    assert shape == [1, 2]
+
+
+def test_stitch_tiles():
+    ds = grid_dataset()
+    tiles, shape = get_tiles(ds, {"rlat": 2, "rlon": 3})
+    stitched = stitch_tiles([ds.isel(tile) for tile in tiles], shape, ["rlat", "rlon"])
+    xr.testing.assert_identical(stitched, ds)
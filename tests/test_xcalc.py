@@ -1,14 +1,21 @@
+import numpy as np
 import pytest  # noqa
+import xarray as xr
 from pyhomogenize import open_xrdataset
+from xclim import atmos
+from xclim.core.calendar import percentile_doy
 
 import index_calculator as xcalc
 
 from .conftest import (
     pr_day_netcdf,
+    pr_series,
     snw_day_netcdf,
     tas_1hr_netcdf,
     tas_day_netcdf,
     tas_eobs_day_netcdf,
+    tas_series,
+    tasmax_series,
     uas_day_netcdf,
     vas_day_netcdf,
 )
@@ -220,3 +227,172 @@ def test_year_frequency_index_calculator():
         contact="test@test.de",
         write=False,
     )
+
+
+def test_batch_index_calculator():
+    data_tas = tas_day_netcdf()
+    data_pr = pr_day_netcdf()
+    data_uas = uas_day_netcdf()
+    data_vas = vas_day_netcdf()
+    ds = open_xrdataset([data_tas, data_pr, data_uas, data_vas])
+    fx_vars = [v for v in ds.data_vars if "time" not in ds[v].dims]
+    # input variables of each index; sfcWind is derived from all variables
+    variables = {
+        "TG": ["tas"],
+        "RR": ["pr"],
+        "RX1day": ["pr"],
+        "R95p": ["pr"],
+        "FG": ["pr", "tas", "uas", "vas"],
+    }
+    indices = list(variables)
+    kwargs = dict(
+        freq="week",
+        crop_time_axis=False,
+        project="CORDEX",
+        institution="test institution",
+        institution_id="TEST",
+        contact="test@test.de",
+        base_period_time_range=["2001-01-01", "2001-01-07"],
+    )
+    batch = xcalc.batch(ds=ds, indices=indices, write=True, **kwargs)
+    assert list(batch.results.keys()) == indices
+    for index in indices:
+        assert sorted(batch.results[index].var_name) == variables[index]
+        single = xcalc.index_calculator(
+            ds=ds[variables[index] + fx_vars],
+            index=index,
+            **kwargs,
+        )
+        assert len(batch.results[index].postproc) == len(single.postproc)
+        for result, expected in zip(batch.results[index].postproc, single.postproc):
+            expected = expected.compute()
+            for output in [result, expected]:
+                output.attrs.pop("ci_creation_date")
+                output[index].attrs.pop("history")
+            xr.testing.assert_identical(result, expected)
+
+
+def test_zarr_index_calculator(tmp_path):
+    pytest.importorskip("zarr")
+    data = tas_day_netcdf()
+    tas_ds = open_xrdataset(data)
+    xcalc.index_calculator(
+        ds=tas_ds,
+        freq="week",
+        index="TG",
+        crop_time_axis=False,
+        project="CORDEX",
+        institution="test institution",
+        institution_id="TEST",
+        contact="test@test.de",
+        write=True,
+        output_dir=str(tmp_path),
+        output_format="zarr",
+    )
+    assert list(tmp_path.glob("**/TG_*.zarr"))
+
+
+@pytest.mark.parametrize(
+    "encoding_profile", ["archive", "fast-read-timeseries", "fast-read-maps"]
+)
+def test_encoding_profile_index_calculator(tmp_path, encoding_profile):
+    data = tas_day_netcdf()
+    tas_ds = open_xrdataset(data)
+    xcalc.index_calculator(
+        ds=tas_ds,
+        freq="week",
+        index="TG",
+        crop_time_axis=False,
+        project="CORDEX",
+        institution="test institution",
+        institution_id="TEST",
+        contact="test@test.de",
+        write=True,
+        output_dir=str(tmp_path),
+        encoding_profile=encoding_profile,
+    )
+    output = xr.open_dataset(next(tmp_path.glob("**/TG_*.nc")))
+    assert output["TG"].encoding["zlib"] is True
+
+
+@pytest.mark.parametrize("output_format", ["netcdf", "zarr"])
+@pytest.mark.parametrize("freq", ["year", "mon", "week"])
+def test_append_index_calculator(tmp_path, freq, output_format):
+    if output_format == "zarr":
+        pytest.importorskip("zarr")
+    rng = np.random.default_rng(0)
+    tas_ds = tas_series(rng.uniform(273, 293, 1096), start="1971-01-01").to_dataset()
+    kwargs = dict(
+        freq=freq,
+        index="TG",
+        crop_time_axis=False,
+        project="CORDEX",
+        institution="test institution",
+        institution_id="TEST",
+        contact="test@test.de",
+        write=True,
+        output_format=output_format,
+    )
+    # the last period is incomplete in the first run
+    xcalc.index_calculator(
+        ds=tas_ds.isel(time=slice(None, -300)),
+        output_dir=str(tmp_path / "append"),
+        **kwargs,
+    )
+    xcalc.index_calculator(
+        ds=tas_ds,
+        output_dir=str(tmp_path / "append"),
+        append=True,
+        **kwargs,
+    )
+    xcalc.index_calculator(ds=tas_ds, output_dir=str(tmp_path / "full"), **kwargs)
+    suffix = ".nc" if output_format == "netcdf" else ".zarr"
+    appended = sorted((tmp_path / "append").glob(f"**/TG_*{suffix}"))
+    full = sorted((tmp_path / "full").glob(f"**/TG_*{suffix}"))
+    assert len(full) == 2
+    assert [f.name for f in appended] == [f.name for f in full]
+    for appended_file, full_file in zip(appended, full):
+        appended_ds = xr.open_dataset(appended_file)
+        full_ds = xr.open_dataset(full_file)
+        for output in [appended_ds, full_ds]:
+            output["TG"].attrs.pop("history")
+        for var_name, var in full_ds.data_vars.items():
+            if "time" in var.dims:
+                xr.testing.assert_identical(appended_ds[var_name], var)
+
+
+@pytest.mark.parametrize(
+    "index,percentile_engine",
+    [("TX90p", "xclim"), ("R95p", "xclim"), ("TX90p", "partition")],
+)
+def test_bootstrap_index_calculator(index, percentile_engine):
+    rng = np.random.default_rng(0)
+    tasmax = tasmax_series(rng.uniform(273, 293, 1461))
+    pr = pr_series(np.where(rng.uniform(size=1461) > 0.4, rng.gamma(1, 5, 1461), 0))
+    pr = pr / 86400
+    base_period_time_range = ["2000-01-01", "2002-12-31"]
+    if index == "TX90p":
+        base = tasmax.sel(time=slice(*base_period_time_range))
+        per = percentile_doy(base, per=90).sel(percentiles=90)
+        expected = atmos.tx90p(tasmax=tasmax, tasmax_per=per, freq="YS", bootstrap=True)
+    else:
+        base = pr.sel(time=slice(*base_period_time_range))
+        per = percentile_doy(base.where(base > 1 / 86400), per=95)
+        expected = atmos.days_over_precip_doy_thresh(
+            pr=pr, pr_per=per.sel(percentiles=95), freq="YS", bootstrap=True
+        )
+    kwargs = dict(
+        ds=xr.merge([tasmax, pr]).chunk(),
+        freq="year",
+        crop_time_axis=False,
+        base_period_time_range=base_period_time_range,
+        percentile_engine=percentile_engine,
+    )
+    idx = xcalc.index_calculator(index=index, bootstrap=True, **kwargs)
+    result = xr.concat(idx.postproc, dim="time")[index]
+    np.testing.assert_allclose(result, expected)
+    batch = xcalc.batch(indices=[index], bootstrap=True, **kwargs)
+    result = xr.concat(batch.results[index].postproc, dim="time")[index]
+    np.testing.assert_allclose(result, expected)
+    idx = xcalc.index_calculator(index=index, **kwargs)
+    assert not np.allclose(xr.concat(idx.postproc, dim="time")[index], expected)